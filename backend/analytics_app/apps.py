@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class AnalyticsAppConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'analytics_app'
+
+    def ready(self):
+        # Connect the receivers that keep the daily rollups current
+        from . import rollups  # noqa: F401
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from analytics_app.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the daily analytics rollups from the Booking table, for every rental "
+        "or for the given rentals (and their current categories) and categories. After "
+        "moving rentals to another category without save() (e.g. import_rentals), pass "
+        "the old category with --category."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rental', type=int, action='append', dest='rentals',
+                            help="Only rebuild this rental id (may be repeated).")
+        parser.add_argument('--category', action='append', dest='categories',
+                            help="Only rebuild this category (may be repeated).")
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        written = rebuild_rollups(options['rentals'], options['categories'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} rollup row(s)."))
@@ -0,0 +1,48 @@
+# Generated by Django 5.2 on 2026-10-17 12:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('rentals_app', '0007_rental_external_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('currency', models.CharField(max_length=10)),
+                ('booked_days', models.IntegerField(default=0)),
+                ('bookings', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('category', models.CharField(max_length=255)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['day', 'category'], name='category_daily_stats_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('category', 'day', 'currency'), name='category_daily_stats_key')],
+            },
+        ),
+        migrations.CreateModel(
+            name='RentalDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('currency', models.CharField(max_length=10)),
+                ('booked_days', models.IntegerField(default=0)),
+                ('bookings', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('rental', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='rentals_app.rental')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['day'], name='rental_daily_stats_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('rental', 'day', 'currency'), name='rental_daily_stats_key')],
+            },
+        ),
+    ]
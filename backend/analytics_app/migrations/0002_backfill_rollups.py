@@ -0,0 +1,44 @@
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import migrations
+
+
+def backfill_rollups(apps, schema_editor):
+    Booking = apps.get_model('booking_app', 'Booking')
+    RentalDailyStats = apps.get_model('analytics_app', 'RentalDailyStats')
+    CategoryDailyStats = apps.get_model('analytics_app', 'CategoryDailyStats')
+
+    totals = defaultdict(lambda: [0, 0, Decimal(0)])
+    rows = Booking.objects.order_by().values_list(
+        'rental_id', 'rental__category', 'start_date', 'end_date', 'currency', 'payment_status', 'total_price')
+    for rental_id, category, start, end, currency, payment_status, total_price in rows.iterator(chunk_size=1000):
+        revenue = total_price if payment_status == 'Completed' else Decimal(0)
+        for key in (('rental', rental_id), ('category', category)):
+            for offset in range((end - start).days + 1):
+                totals[key, start + timedelta(days=offset), currency][0] += 1
+            totals[key, start, currency][1] += 1
+            totals[key, start, currency][2] += revenue
+
+    rental_rows, category_rows = [], []
+    for ((level, value), day, currency), (booked_days, bookings, revenue) in totals.items():
+        fields = dict(day=day, currency=currency, booked_days=booked_days, bookings=bookings, revenue=revenue)
+        if level == 'rental':
+            rental_rows.append(RentalDailyStats(rental_id=value, **fields))
+        else:
+            category_rows.append(CategoryDailyStats(category=value, **fields))
+    RentalDailyStats.objects.bulk_create(rental_rows, batch_size=1000)
+    CategoryDailyStats.objects.bulk_create(category_rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics_app', '0001_initial'),
+        ('booking_app', '0005_booking_start_date_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
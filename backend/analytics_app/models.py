@@ -0,0 +1,42 @@
+from django.db import models
+from rentals_app.models import Rental
+
+
+class DailyStats(models.Model):
+    """
+    Booking activity for one day in one currency. Each day a booking covers
+    adds one booked day. The booking itself, and its revenue once its payment
+    is Completed, count on its start day.
+    """
+    day = models.DateField()
+    currency = models.CharField(max_length=10)
+    booked_days = models.IntegerField(default=0)
+    bookings = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        abstract = True
+
+
+class RentalDailyStats(DailyStats):
+    rental = models.ForeignKey(Rental, on_delete=models.CASCADE, related_name='daily_stats')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['rental', 'day', 'currency'], name='rental_daily_stats_key'),
+        ]
+        indexes = [
+            models.Index(fields=['day'], name='rental_daily_stats_day_idx'),
+        ]
+
+
+class CategoryDailyStats(DailyStats):
+    category = models.CharField(max_length=255)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['category', 'day', 'currency'], name='category_daily_stats_key'),
+        ]
+        indexes = [
+            models.Index(fields=['day', 'category'], name='category_daily_stats_day_idx'),
+        ]
@@ -0,0 +1,203 @@
+"""
+Keeps the daily analytics rollups in step with bookings.
+
+A booking contributes to the rows of its rental and of its rental's category
+(see DailyStats). Every booking save or delete works out the net change
+between the booking's old and new contribution. For example, completing a
+payment only adds revenue on the start day, and moving the dates only
+touches the days that changed. Once the booking transaction commits, the
+change is applied as a few UPDATE ... SET col = col + delta statements, one
+per distinct delta. Dashboards therefore read the rollups and never scan
+Booking.
+
+Changes are applied after commit so they do not lengthen the booking
+transaction, which holds the rental lock. Saving a rental with a new
+category rebuilds the old and the new category after commit.
+
+The rollups drift, until the next save of the affected booking or a
+rebuild, when:
+
+- a process dies between the commit and applying the change
+- bookings are written without model signals: QuerySet.update(),
+  bulk_create() or bulk_update(), for example a payment status set through
+  Booking.objects.filter(...).update() inside a transaction
+- a rental's category changes without a save(), e.g. via QuerySet.update()
+  or `manage.py import_rentals`, which uses bulk_update()
+
+`manage.py rebuild_analytics` rebuilds them from the Booking table: all of
+them, or only given rentals (--rental) or categories (--category).
+"""
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from booking_app.models import Booking
+from rentals_app.models import Rental
+from .models import CategoryDailyStats, RentalDailyStats
+
+logger = logging.getLogger(__name__)
+
+PAID_STATUS = 'Completed'
+SNAPSHOT_FIELDS = ('rental_id', 'start_date', 'end_date', 'currency', 'payment_status', 'total_price')
+
+
+def new_deltas():
+    # (model, key, day, currency) -> [booked_days, bookings, revenue]
+    return defaultdict(lambda: [0, 0, Decimal(0)])
+
+
+def add_contribution(deltas, values, category, sign, rental_level=True):
+    """Add (sign=1) or remove (sign=-1) one booking's contribution."""
+    rental_id, start, end, currency, payment_status, total_price = (values[name] for name in SNAPSHOT_FIELDS)
+    revenue = Decimal(str(total_price)) if payment_status == PAID_STATUS else Decimal(0)
+    levels = [(CategoryDailyStats, (('category', category),))]
+    if rental_level:
+        levels.append((RentalDailyStats, (('rental_id', rental_id),)))
+    for model, key in levels:
+        for offset in range((end - start).days + 1):
+            deltas[model, key, start + timedelta(days=offset), currency][0] += sign
+        row = deltas[model, key, start, currency]
+        row[1] += sign
+        row[2] += sign * revenue
+
+
+def apply_deltas(deltas):
+    """Write a set of deltas: one INSERT per model for new rows, one UPDATE per distinct delta."""
+    groups = defaultdict(list)
+    missing = defaultdict(list)
+    for (model, key, day, currency), (booked_days, bookings, revenue) in deltas.items():
+        if not (booked_days or bookings or revenue):
+            continue
+        groups[model, key, currency, booked_days, bookings, revenue].append(day)
+        if booked_days > 0 or bookings > 0 or revenue > 0:
+            # Removals only ever touch rows an earlier addition created
+            missing[model].append(model(day=day, currency=currency, **dict(key)))
+    for model, rows in missing.items():
+        model.objects.bulk_create(rows, ignore_conflicts=True)
+    for (model, key, currency, booked_days, bookings, revenue), days in groups.items():
+        model.objects.filter(currency=currency, day__in=days, **dict(key)).update(
+            booked_days=F('booked_days') + booked_days,
+            bookings=F('bookings') + bookings,
+            revenue=F('revenue') + revenue,
+        )
+
+
+def _apply_after_commit(deltas):
+    def apply():
+        try:
+            with transaction.atomic():
+                apply_deltas(deltas)
+        except Exception:
+            logger.exception("Failed to update analytics rollups; run `manage.py rebuild_analytics`")
+
+    if any(any(delta) for delta in deltas.values()):
+        transaction.on_commit(apply)
+
+
+def _snapshot(instance):
+    # Deferred fields are left out of __dict__; treat them as unknown
+    return {name: instance.__dict__.get(name) for name in SNAPSHOT_FIELDS}
+
+
+def _category(instance, rental_id):
+    rental = instance._state.fields_cache.get('rental')
+    if rental is not None and rental.pk == rental_id and 'category' in rental.__dict__:
+        return rental.category
+    return Rental.objects.filter(pk=rental_id).values_list('category', flat=True).first()
+
+
+@receiver(post_init, sender=Booking)
+def remember_booking(sender, instance, **kwargs):
+    instance._analytics_snapshot = _snapshot(instance) if instance.pk else None
+
+
+@receiver(post_save, sender=Booking)
+def record_saved_booking(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old, new = instance._analytics_snapshot, _snapshot(instance)
+    instance._analytics_snapshot = new
+    if old == new:
+        return
+    if not created and (old is None or None in old.values()):
+        # Loaded without the fields we need (e.g. via .only()); rebuild this rental
+        logger.warning("Booking %s saved without an analytics snapshot; rebuilding its rental", instance.pk)
+        transaction.on_commit(lambda: rebuild_rollups([instance.rental_id]))
+        return
+    deltas = new_deltas()
+    if not created:
+        add_contribution(deltas, old, _category(instance, old['rental_id']), -1)
+    add_contribution(deltas, new, _category(instance, new['rental_id']), 1)
+    _apply_after_commit(deltas)
+
+
+@receiver(post_delete, sender=Booking)
+def record_deleted_booking(sender, instance, **kwargs):
+    old = instance._analytics_snapshot
+    if old is None or None in old.values():
+        transaction.on_commit(lambda: rebuild_rollups([instance.rental_id]))
+        return
+    deltas = new_deltas()
+    # Runs before a cascading rental delete removes the rental row
+    add_contribution(deltas, old, _category(instance, old['rental_id']), -1)
+    _apply_after_commit(deltas)
+
+
+@receiver(post_init, sender=Rental)
+def remember_category(sender, instance, **kwargs):
+    instance._analytics_category = instance.__dict__.get('category')
+
+
+@receiver(post_save, sender=Rental)
+def rebuild_moved_rental(sender, instance, created, raw=False, **kwargs):
+    old, new = instance._analytics_category, instance.__dict__.get('category')
+    instance._analytics_category = new
+    if created or raw or old is None or old == new:
+        return
+    # The rental's rows are keyed by rental and stay valid; its bookings
+    # move from one category's rows to the other's
+    transaction.on_commit(lambda: rebuild_rollups(rental_ids=(), categories=(old, new)), robust=True)
+
+
+def rebuild_rollups(rental_ids=None, categories=None, batch_size=1000):
+    """
+    Recompute the rollups from the Booking table. For all of them, or only
+    for the given rentals and categories. A rental's current category is
+    rebuilt with it; after a category change that bypassed save(), pass the
+    old category too. Returns the number of rows written.
+    """
+    bookings = Booking.objects.order_by()
+    rental_rows = RentalDailyStats.objects.all()
+    category_rows = CategoryDailyStats.objects.all()
+    if rental_ids is not None or categories is not None:
+        rental_ids = set(rental_ids or ())
+        categories = set(categories or ()) | set(
+            Rental.objects.filter(id__in=rental_ids).values_list('category', flat=True))
+        bookings = bookings.filter(rental__category__in=categories)
+        rental_rows = rental_rows.filter(rental_id__in=rental_ids)
+        category_rows = category_rows.filter(category__in=categories)
+
+    deltas = new_deltas()
+    fields = (*SNAPSHOT_FIELDS, 'rental__category')
+    for row in bookings.values_list(*fields).iterator(chunk_size=batch_size):
+        values = dict(zip(fields, row))
+        in_scope = rental_ids is None or values['rental_id'] in rental_ids
+        add_contribution(deltas, values, values['rental__category'], 1, rental_level=in_scope)
+
+    rows = defaultdict(list)
+    for (model, key, day, currency), (booked_days, bookings_count, revenue) in deltas.items():
+        if booked_days or bookings_count or revenue:
+            rows[model].append(model(day=day, currency=currency, booked_days=booked_days,
+                                     bookings=bookings_count, revenue=revenue, **dict(key)))
+    with transaction.atomic():
+        rental_rows.delete()
+        category_rows.delete()
+        for model, objs in rows.items():
+            model.objects.bulk_create(objs, batch_size=batch_size)
+    return sum(len(objs) for objs in rows.values())
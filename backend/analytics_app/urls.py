@@ -0,0 +1,8 @@
+from django.urls import path
+from .views import CategoryStatsView, DailyStatsView, RentalStatsView
+
+urlpatterns = [
+    path('categories/', CategoryStatsView.as_view(), name='analytics-categories'),  # Per-category totals
+    path('rentals/', RentalStatsView.as_view(), name='analytics-rentals'),  # Per-rental totals
+    path('daily/', DailyStatsView.as_view(), name='analytics-daily'),  # Day-by-day series
+]
@@ -0,0 +1,125 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db.models import Count, Sum
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from rentals_app.models import Rental
+from .models import CategoryDailyStats, RentalDailyStats
+
+DEFAULT_DAYS = 30
+MAX_DAYS = 366 * 3
+CENTS = Decimal('0.01')
+
+
+class RangeError(ValueError):
+    pass
+
+
+def date_range(params):
+    """?from / ?to (inclusive); the last DEFAULT_DAYS days by default."""
+    try:
+        end = date.fromisoformat(params['to']) if params.get('to') else date.today()
+        start = date.fromisoformat(params['from']) if params.get('from') else end - timedelta(days=DEFAULT_DAYS - 1)
+    except ValueError:
+        raise RangeError("'from' and 'to' must be dates (YYYY-MM-DD)")
+    if start > end:
+        raise RangeError("'from' must not be after 'to'")
+    if (end - start).days >= MAX_DAYS:
+        raise RangeError(f"The range may span at most {MAX_DAYS} days")
+    return start, end
+
+
+def summarize(rows, group_keys):
+    """Fold per-currency aggregate rows into one entry per group with a revenue map."""
+    groups = {}
+    for row in rows:
+        group = tuple(row[key] for key in group_keys)
+        entry = groups.get(group)
+        if entry is None:
+            entry = groups[group] = {
+                **{key: row[key] for key in group_keys},
+                'booked_days': 0,
+                'bookings': 0,
+                'revenue': {},
+            }
+        entry['booked_days'] += row['booked_days']
+        entry['bookings'] += row['bookings']
+        if row['revenue']:
+            entry['revenue'][row['currency']] = str(Decimal(row['revenue']).quantize(CENTS))
+    return list(groups.values())
+
+
+def utilization(booked_days, rentals, days):
+    """Percent of rental-days booked."""
+    return round(100 * booked_days / (rentals * days), 2) if rentals and days else 0.0
+
+
+def aggregate(queryset, *group_keys):
+    return (queryset.values(*group_keys, 'currency').order_by()
+            .annotate(booked_days=Sum('booked_days'), bookings=Sum('bookings'), revenue=Sum('revenue')))
+
+
+class AnalyticsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        try:
+            start, end = date_range(request.query_params)
+        except RangeError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'from': start, 'to': end, 'results': self.results(request, start, end)})
+
+
+class CategoryStatsView(AnalyticsView):
+    """Booked days, bookings, utilization and revenue per category over a date range."""
+
+    def results(self, request, start, end):
+        days = (end - start).days + 1
+        rentals = dict(Rental.objects.order_by().values_list('category').annotate(count=Count('id')))
+        entries = summarize(aggregate(CategoryDailyStats.objects.filter(day__range=(start, end)), 'category'),
+                            ['category'])
+        for entry in entries:
+            entry['rentals'] = rentals.get(entry['category'], 0)
+            entry['utilization'] = utilization(entry['booked_days'], entry['rentals'], days)
+        return sorted(entries, key=lambda entry: entry['booked_days'], reverse=True)
+
+
+class RentalStatsView(AnalyticsView):
+    """The same figures per rental; filter with ?category=."""
+
+    def results(self, request, start, end):
+        days = (end - start).days + 1
+        rows = RentalDailyStats.objects.filter(day__range=(start, end))
+        if request.query_params.get('category'):
+            rows = rows.filter(rental__category=request.query_params['category'])
+        entries = summarize(aggregate(rows, 'rental_id', 'rental__name', 'rental__category'),
+                            ['rental_id', 'rental__name', 'rental__category'])
+        for entry in entries:
+            entry['name'] = entry.pop('rental__name')
+            entry['category'] = entry.pop('rental__category')
+            entry['utilization'] = utilization(entry['booked_days'], 1, days)
+        return sorted(entries, key=lambda entry: entry['booked_days'], reverse=True)
+
+
+class DailyStatsView(AnalyticsView):
+    """One entry per day across the catalog, or one category with ?category=."""
+
+    def results(self, request, start, end):
+        rows = CategoryDailyStats.objects.filter(day__range=(start, end))
+        rentals = Rental.objects.all()
+        if request.query_params.get('category'):
+            rows = rows.filter(category=request.query_params['category'])
+            rentals = rentals.filter(category=request.query_params['category'])
+        rental_count = rentals.count()
+        entries = {entry['day']: entry for entry in summarize(aggregate(rows, 'day'), ['day'])}
+        series = []
+        for offset in range((end - start).days + 1):
+            day = start + timedelta(days=offset)
+            entry = entries.get(day, {'day': day, 'booked_days': 0, 'bookings': 0, 'revenue': {}})
+            entry['utilization'] = utilization(entry['booked_days'], rental_count, 1)
+            series.append(entry)
+        return series
@@ -0,0 +1,162 @@
+"""
+JWT authentication without a user query per request.
+
+Access tokens minted from issue_tokens() refresh tokens carry the user's
+username, role, is_staff and is_active flags. The refresh token itself does
+not: every refresh re-reads the user, refuses inactive or deleted users and
+writes the current values into the new access token. ClaimsJWTAuthentication
+uses the claims as follows:
+
+- Safe methods (GET/HEAD/OPTIONS) get a User built from the claims alone.
+  The other fields are deferred, so code that reads e.g. `email` still gets
+  the real value through one lazy query, and save() only writes the loaded
+  fields.
+- Unsafe methods get the full user row through a short-lived per-process
+  cache (AUTH_USER_CACHE_TTL seconds), dropped when the user is saved or
+  deleted in this process.
+
+Tokens without the claims (issued before this change) fall back to the
+regular lookup. A role change or deactivation reaches read-only requests
+once the current access token expires (ACCESS_TOKEN_LIFETIME); refreshing
+it picks up the change.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+
+from .blacklist import CachedBlacklistRefreshToken
+from .models import User
+
+# Claim name -> User field
+USER_CLAIMS = {
+    'username': 'username',
+    'role': 'role',
+    'is_staff': 'is_staff',
+    'is_active': 'is_active',
+}
+
+
+class ClaimsRefreshToken(CachedBlacklistRefreshToken):
+    """Refresh token whose access tokens carry the user's current claims."""
+
+    user = None
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token.user = user
+        return token
+
+    def current_claims(self):
+        if self.user is not None:
+            values = [getattr(self.user, field) for field in USER_CLAIMS.values()]
+        else:
+            # Not cached: a refresh must see role changes made in other processes
+            values = (
+                User.objects.filter(pk=self.payload[api_settings.USER_ID_CLAIM])
+                .values_list(*USER_CLAIMS.values())
+                .first()
+            )
+        claims = dict(zip(USER_CLAIMS, values or ()))
+        if not claims.get('is_active'):
+            raise TokenError('User is inactive or no longer exists')
+        return claims
+
+    @property
+    def access_token(self):
+        access = super().access_token
+        for claim, value in self.current_claims().items():
+            access[claim] = value
+        return access
+
+
+def issue_tokens(user):
+    """Refresh token for `user`; its access tokens get the claims."""
+    return ClaimsRefreshToken.for_user(user)
+
+
+def user_from_claims(token):
+    """A User instance carrying only what the token says about it."""
+    if any(claim not in token for claim in USER_CLAIMS):
+        return None
+    known = {'id': token[api_settings.USER_ID_CLAIM]}
+    known.update((field, token[claim]) for claim, field in USER_CLAIMS.items())
+    # from_db() takes the values of a partial row in model field order
+    field_names = [field.attname for field in User._meta.concrete_fields if field.attname in known]
+    return User.from_db('default', field_names, [known[name] for name in field_names])
+
+
+class UserCache:
+    """Per-process TTL cache of user rows; hands out a fresh instance per hit."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.rows = {}
+
+    def ttl(self):
+        return getattr(settings, 'AUTH_USER_CACHE_TTL', 30)
+
+    def get(self, user_id):
+        entry = self.rows.get(user_id)
+        if entry is not None and entry[0] > time.monotonic():
+            field_names, values = entry[1]
+            return User.from_db('default', field_names, values)
+        user = User.objects.filter(pk=user_id).first()
+        if user is not None and self.ttl() > 0:
+            field_names = [field.attname for field in User._meta.concrete_fields]
+            row = (field_names, [getattr(user, name) for name in field_names])
+            with self.lock:
+                self.rows[user_id] = (time.monotonic() + self.ttl(), row)
+        return user
+
+    def discard(self, user_id):
+        with self.lock:
+            self.rows.pop(user_id, None)
+
+
+user_cache = UserCache()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def drop_cached_user(sender, instance, **kwargs):
+    user_cache.discard(instance.pk)
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+
+        if request.method in SAFE_METHODS:
+            user = user_from_claims(validated_token)
+            if user is not None:
+                if not user.is_active:
+                    raise AuthenticationFailed('User is inactive', code='user_inactive')
+                return user, validated_token
+        return self.get_user(validated_token), validated_token
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken('Token contained no recognizable user identification')
+
+        user = user_cache.get(user_id)
+        if user is None:
+            raise AuthenticationFailed('User not found', code='user_not_found')
+        if not user.is_active:
+            raise AuthenticationFailed('User is inactive', code='user_inactive')
+        return user
@@ -0,0 +1,82 @@
+"""
+Refresh-token blacklist checks without a query per refresh.
+
+simplejwt checks `BlacklistedToken` on every token refresh and logout. Here
+each process keeps the blacklisted JTIs in memory. Every
+AUTH_BLACKLIST_REFRESH seconds it fetches only the rows added since the last
+sync, and it drops JTIs once their token has expired anyway. A token
+blacklisted by this process (logout) is added immediately. Other processes
+see it after their next sync, so a revoked refresh token can be used for at
+most AUTH_BLACKLIST_REFRESH seconds on another worker. Set it to 0 to check
+the database every time.
+
+Expired rows are removed by `manage.py purge_tokens`.
+"""
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+# Re-read rows this far behind the last sync, so a row whose transaction
+# committed after a later one had been read is still picked up
+SYNC_OVERLAP = timedelta(seconds=30)
+
+
+class TokenBlacklist:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.jtis = {}  # jti -> token expiry (epoch seconds)
+        self.synced_at = None
+        self.next_sync = 0.0
+
+    def interval(self):
+        return getattr(settings, 'AUTH_BLACKLIST_REFRESH', 5)
+
+    def contains(self, jti):
+        if self.interval() <= 0:
+            return BlacklistedToken.objects.filter(token__jti=jti).exists()
+        if time.monotonic() >= self.next_sync:
+            self.sync()
+        return jti in self.jtis
+
+    def sync(self):
+        with self.lock:
+            if time.monotonic() < self.next_sync:
+                return  # Another thread just did it
+            started = timezone.now()
+            rows = BlacklistedToken.objects.values_list('token__jti', 'token__expires_at')
+            if self.synced_at is not None:
+                rows = rows.filter(blacklisted_at__gte=self.synced_at - SYNC_OVERLAP)
+            now = started.timestamp()
+            jtis = {jti: expires for jti, expires in self.jtis.items() if expires > now}
+            for jti, expires_at in rows:
+                jtis[jti] = expires_at.timestamp()
+            # Readers check membership without the lock; swap in the new dict
+            self.jtis = jtis
+            self.synced_at = started
+            self.next_sync = time.monotonic() + self.interval()
+
+    def add(self, jti, expires):
+        with self.lock:
+            self.jtis[jti] = expires
+
+
+token_blacklist = TokenBlacklist()
+
+
+class CachedBlacklistRefreshToken(RefreshToken):
+    def check_blacklist(self):
+        if token_blacklist.contains(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_('Token is blacklisted'))
+
+    def blacklist(self):
+        result = super().blacklist()
+        token_blacklist.add(self.payload[api_settings.JTI_CLAIM], self.payload['exp'])
+        return result
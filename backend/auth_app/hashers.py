@@ -0,0 +1,107 @@
+"""
+Password hashing off the request threads, with a bound on concurrency.
+
+PBKDF2 is deliberately CPU-heavy, so a burst of logins can occupy every
+worker thread. Here PBKDF2 runs on a small per-process pool
+(AUTH_HASH_WORKERS threads). hashlib releases the GIL while it hashes, so
+the worker's other threads keep serving requests. At most
+AUTH_HASH_QUEUE more hashes may wait for the pool; by default that leaves
+one gunicorn thread free for other requests (see settings.py). A caller
+that cannot get a slot within AUTH_HASH_WAIT seconds gets a 503 rather
+than piling up more CPU work. AUTH_HASH_WORKERS = 0 hashes inline.
+
+The iteration count comes from PASSWORD_HASH_ITERATIONS. Stored hashes
+with a different count are upgraded on the next successful login: Django's
+check_password() rehashes when the preferred hasher's must_update() says
+so.
+
+This module imports no models, so bulk commands can hand
+init_hashing_worker() and hash_password() to a process pool under any start
+method.
+"""
+import atexit
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, make_password
+from rest_framework.exceptions import APIException
+
+
+class HashingBusy(APIException):
+    status_code = 503
+    default_detail = 'Too many sign-ins in progress, please retry shortly.'
+    default_code = 'hashing_busy'
+
+
+class HashingPool:
+    def __init__(self, workers, queue, wait):
+        self.workers = workers
+        self.wait = wait
+        self.slots = threading.BoundedSemaphore(workers + queue) if workers > 0 else None
+        self.executor = None
+        self.lock = threading.Lock()
+
+    def get_executor(self):
+        if self.executor is None:
+            with self.lock:
+                if self.executor is None:
+                    self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='password-hashing')
+                    atexit.register(self.executor.shutdown)
+        return self.executor
+
+    def run(self, fn, *args):
+        if self.slots is None:
+            return fn(*args)
+        if not self.slots.acquire(timeout=self.wait):
+            raise HashingBusy()
+        try:
+            return self.get_executor().submit(fn, *args).result()
+        finally:
+            self.slots.release()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = HashingPool(
+                    workers=getattr(settings, 'AUTH_HASH_WORKERS', 2),
+                    queue=getattr(settings, 'AUTH_HASH_QUEUE', 1),
+                    wait=getattr(settings, 'AUTH_HASH_WAIT', 2.0),
+                )
+    return _pool
+
+
+def set_pool(pool):
+    """Replace the process-wide pool (used by bench_login); returns the old one."""
+    global _pool
+    with _pool_lock:
+        previous, _pool = _pool, pool
+    return previous
+
+
+class PooledPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """pbkdf2_sha256 with a configurable iteration count, hashed on the pool."""
+
+    @property
+    def iterations(self):
+        return getattr(settings, 'PASSWORD_HASH_ITERATIONS', None) or PBKDF2PasswordHasher.iterations
+
+    def encode(self, password, salt, iterations=None):
+        return get_pool().run(super().encode, password, salt, iterations)
+
+
+def init_hashing_worker():
+    """Process pool initializer: hash inline, the process pool is the parallelism."""
+    set_pool(HashingPool(workers=0, queue=0, wait=0))
+
+
+def hash_password(password):
+    """make_password() for process pool workers; empty passwords become unusable."""
+    return make_password(password or None)
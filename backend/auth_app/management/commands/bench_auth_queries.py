@@ -0,0 +1,79 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from auth_app.authentication import ClaimsJWTAuthentication, issue_tokens
+from auth_app.models import User
+from backend.transactions import rolled_back
+from booking_app.views import ActiveBookingsView, BookingListCreateView, PaymentHistoryView, RentalHistoryView
+from notifications_app.views import NotificationListView, UnreadNotificationsView, unread_notification_count
+
+ENDPOINTS = {
+    'bookings': (BookingListCreateView, '/api/bookings/'),
+    'bookings-active': (ActiveBookingsView, '/api/bookings/active/'),
+    'bookings-history': (RentalHistoryView, '/api/bookings/history/'),
+    'bookings-payments': (PaymentHistoryView, '/api/bookings/payments/'),
+    'notifications': (NotificationListView, '/api/notifications/'),
+    'notifications-unread': (unread_notification_count.cls, '/api/notifications/unread/'),
+    'notifications-unread-count': (UnreadNotificationsView, '/api/notifications/unread-count/'),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare queries and time per read-only booking/notification request '
+        'authenticated with the stock JWTAuthentication (user looked up per '
+        'request) and with ClaimsJWTAuthentication (user built from the token). '
+        'The seed user is rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help="Requests per endpoint and scheme.")
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            user = User.objects.create_user(username='bench-auth-queries', password=None)
+            schemes = {
+                'lookup': (JWTAuthentication, str(RefreshToken.for_user(user).access_token)),
+                'claims': (ClaimsJWTAuthentication, str(issue_tokens(user).access_token)),
+            }
+            results = {name: self.measure(auth_class, token, options['requests'])
+                       for name, (auth_class, token) in schemes.items()}
+
+        self.stdout.write(f"{'endpoint':<28}{'lookup q':>10}{'claims q':>10}{'lookup ms':>11}{'claims ms':>11}")
+        saved = 0
+        for name in ENDPOINTS:
+            lookup_queries, lookup_ms = results['lookup'][name]
+            claims_queries, claims_ms = results['claims'][name]
+            saved += lookup_queries - claims_queries
+            self.stdout.write(f'{name:<28}{lookup_queries:>10}{claims_queries:>10}'
+                              f'{lookup_ms:>11.3f}{claims_ms:>11.3f}')
+        self.stdout.write(self.style.SUCCESS(
+            f'{saved} queries saved across {len(ENDPOINTS)} endpoints, one request each'))
+
+    def measure(self, auth_class, token, requests):
+        factory = APIRequestFactory()
+        results = {}
+        for name, (view_class, path) in ENDPOINTS.items():
+            view = view_class.as_view(authentication_classes=[auth_class])
+
+            def call():
+                request = factory.get(path, HTTP_AUTHORIZATION=f'Bearer {token}')
+                response = view(request)
+                response.render()
+                if response.status_code != 200:
+                    raise CommandError(f'{name} returned {response.status_code}')
+
+            with CaptureQueriesContext(connection) as captured:
+                call()
+            started = time.perf_counter()
+            for _ in range(requests):
+                call()
+            elapsed = (time.perf_counter() - started) * 1000 / requests
+            results[name] = (len(captured), elapsed)
+        return results
@@ -0,0 +1,115 @@
+import statistics
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from rest_framework.test import APIRequestFactory
+
+from auth_app import hashers
+from auth_app.authentication import issue_tokens
+from auth_app.models import User
+from auth_app.views import login
+from booking_app.views import BookingListCreateView
+
+USERNAME = 'bench-login'
+PASSWORD = 'bench-login-password'
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class Command(BaseCommand):
+    help = (
+        'Run a login burst alongside booking list traffic, once hashing inline on '
+        'the request threads and once on the bounded hashing pool, and report '
+        'login throughput and booking latency for each. Throttles are bypassed; '
+        'the benchmark user is deleted afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--duration', type=float, default=5, help="Seconds per run.")
+        parser.add_argument('--login-threads', type=int, default=8)
+        parser.add_argument('--booking-threads', type=int, default=4)
+        parser.add_argument('--workers', type=int, default=settings.AUTH_HASH_WORKERS,
+                            help="Hashing pool size for the pooled run.")
+        parser.add_argument('--queue', type=int, default=settings.AUTH_HASH_QUEUE)
+
+    def handle(self, *args, **options):
+        User.objects.filter(username=USERNAME).delete()
+        user = User.objects.create_user(username=USERNAME, password=PASSWORD)
+        token = str(issue_tokens(user).access_token)
+        runs = {
+            'inline': hashers.HashingPool(workers=0, queue=0, wait=0),
+            f"pool({options['workers']})": hashers.HashingPool(
+                workers=options['workers'], queue=options['queue'], wait=settings.AUTH_HASH_WAIT),
+        }
+        previous = hashers.get_pool()
+        try:
+            results = {}
+            for label, pool in runs.items():
+                hashers.set_pool(pool)
+                results[label] = self.measure(token, options)
+        finally:
+            hashers.set_pool(previous)
+            User.objects.filter(username=USERNAME).delete()
+
+        self.stdout.write(f"{'hashing':<12}{'logins/s':>10}{'503s':>6}{'login p50':>11}{'login p95':>11}"
+                          f"{'bookings/s':>12}{'booking p50':>13}{'booking p95':>13}")
+        for label, (logins, busy, bookings, duration) in results.items():
+            self.stdout.write(
+                f'{label:<12}{len(logins) / duration:>10.1f}{busy:>6}'
+                f'{statistics.median(logins or [0]):>11.1f}{percentile(logins, 0.95):>11.1f}'
+                f'{len(bookings) / duration:>12.1f}'
+                f'{statistics.median(bookings or [0]):>13.1f}{percentile(bookings, 0.95):>13.1f}'
+            )
+        self.stdout.write(self.style.SUCCESS('Latencies in ms'))
+
+    def measure(self, token, options):
+        factory = APIRequestFactory()
+        login_view = login.cls.as_view(throttle_classes=[])
+        booking_view = BookingListCreateView.as_view()
+        deadline = time.monotonic() + options['duration']
+        lock = threading.Lock()
+        logins, bookings, busy = [], [], [0]
+
+        def login_loop():
+            timings, rejected = [], 0
+            while time.monotonic() < deadline:
+                request = factory.post('/api/auth/login/', {'username': USERNAME, 'password': PASSWORD},
+                                       format='json')
+                started = time.perf_counter()
+                response = login_view(request)
+                if response.status_code == 200:
+                    timings.append((time.perf_counter() - started) * 1000)
+                else:
+                    rejected += 1
+            connection.close()
+            with lock:
+                logins.extend(timings)
+                busy[0] += rejected
+
+        def booking_loop():
+            timings = []
+            while time.monotonic() < deadline:
+                request = factory.get('/api/bookings/', HTTP_AUTHORIZATION=f'Bearer {token}')
+                started = time.perf_counter()
+                booking_view(request).render()
+                timings.append((time.perf_counter() - started) * 1000)
+            connection.close()
+            with lock:
+                bookings.extend(timings)
+
+        threads = [threading.Thread(target=login_loop) for _ in range(options['login_threads'])]
+        threads += [threading.Thread(target=booking_loop) for _ in range(options['booking_threads'])]
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return logins, busy[0], bookings, time.monotonic() - started
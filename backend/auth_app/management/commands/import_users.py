@@ -0,0 +1,104 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.db.models.functions import Lower
+
+from auth_app.hashers import hash_password, init_hashing_worker
+from auth_app.models import User
+from backend.records import FORMATS, RecordError, batched, read_records
+
+ROLES = {value for value, _ in User.ROLE_CHOICES}
+
+
+class Command(BaseCommand):
+    help = (
+        'Create users from a CSV (with a header row) or JSONL file with the fields '
+        'username, email, password and optionally role, first_name and last_name. '
+        'Passwords are hashed across a process pool and each batch is written with '
+        'one bulk INSERT. Rows whose username or email (case-insensitive) already '
+        'exists are skipped; rows without a password get an unusable one. Lines that '
+        'cannot be parsed are reported and counted as invalid.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=FORMATS)
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+        parser.add_argument('--role', default='user', choices=sorted(ROLES), help="Role for rows that set none.")
+
+    def handle(self, *args, **options):
+        try:
+            records = read_records(options['path'], options['format'], report_errors=True)
+            created = skipped = invalid = 0
+            seen_usernames, seen_emails = set(), set()
+            with ProcessPoolExecutor(max_workers=options['workers'], initializer=init_hashing_worker) as executor:
+                for batch in batched(records, options['batch_size']):
+                    rows = []
+                    for number, record in batch:
+                        try:
+                            if isinstance(record, RecordError):
+                                raise ValidationError(str(record))
+                            rows.append(self.clean(record, options['role']))
+                        except ValidationError as e:
+                            invalid += 1
+                            self.stderr.write(f"Line {number}: {'; '.join(e.messages)}")
+
+                    existing_usernames = set(User.objects.filter(
+                        username__in=[row['username'] for row in rows]).values_list('username', flat=True))
+                    existing_emails = set(User.objects.annotate(email_lower=Lower('email')).filter(
+                        email_lower__in=[row['email'].lower() for row in rows if row['email']],
+                    ).values_list('email_lower', flat=True))
+                    new_rows = []
+                    for row in rows:
+                        email = row['email'].lower()
+                        if (row['username'] in existing_usernames or row['username'] in seen_usernames
+                                or (email and (email in existing_emails or email in seen_emails))):
+                            skipped += 1
+                            continue
+                        seen_usernames.add(row['username'])
+                        if email:
+                            seen_emails.add(email)
+                        new_rows.append(row)
+
+                    chunksize = max(1, len(new_rows) // (options['workers'] * 4))
+                    passwords = executor.map(hash_password, [row.pop('password') for row in new_rows],
+                                             chunksize=chunksize)
+                    users = [User(password=password, **row) for row, password in zip(new_rows, passwords)]
+                    with transaction.atomic():
+                        User.objects.bulk_create(users)
+                    created += len(users)
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        style = self.style.SUCCESS if not invalid else self.style.WARNING
+        self.stdout.write(style(f'Created {created} user(s); skipped {skipped} existing, {invalid} invalid.'))
+
+    def clean(self, record, default_role):
+        username = str(record.get('username') or '').strip()
+        email = User.objects.normalize_email(str(record.get('email') or '').strip())
+        role = str(record.get('role') or default_role).strip()
+        errors = []
+        if not username:
+            errors.append('username is required')
+        if email:
+            try:
+                validate_email(email)
+            except ValidationError:
+                errors.append(f'invalid email {email!r}')
+        if role not in ROLES:
+            errors.append(f'unknown role {role!r}')
+        if errors:
+            raise ValidationError(errors)
+        return {
+            'username': username,
+            'email': email,
+            'password': record.get('password') or '',
+            'role': role,
+            'first_name': str(record.get('first_name') or '')[:150],
+            'last_name': str(record.get('last_name') or '')[:150],
+        }
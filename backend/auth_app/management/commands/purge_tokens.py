@@ -0,0 +1,36 @@
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete expired outstanding and blacklisted refresh tokens and expired '
+        'sessions, in batches so no single delete holds the tables for long. '
+        'Meant to run periodically (cron, scheduler).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        now = timezone.now()
+
+        tokens = blacklisted = 0
+        expired = OutstandingToken.objects.filter(expires_at__lte=now)
+        while ids := list(expired.values_list('id', flat=True)[:batch_size]):
+            with transaction.atomic():
+                # Blacklist rows first, so the token delete has nothing to cascade
+                blacklisted += BlacklistedToken.objects.filter(token_id__in=ids).delete()[0]
+                tokens += OutstandingToken.objects.filter(id__in=ids).delete()[0]
+
+        sessions = 0
+        expired = Session.objects.filter(expire_date__lt=now)
+        while keys := list(expired.values_list('session_key', flat=True)[:batch_size]):
+            sessions += Session.objects.filter(session_key__in=keys).delete()[0]
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Deleted {tokens} expired tokens ({blacklisted} blacklisted) and {sessions} expired sessions'))
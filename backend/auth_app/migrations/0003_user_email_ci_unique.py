@@ -0,0 +1,47 @@
+# Generated by Django 5.2 on 2026-10-17 12:07
+
+import django.db.models.functions.text
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+
+def check_duplicate_emails(apps, schema_editor):
+    """
+    Refuse to add the constraint over accounts whose emails differ only in
+    case. Which account to keep is not ours to guess, so list them.
+    """
+    User = apps.get_model('auth_app', 'User')
+    duplicates = list(
+        User.objects.exclude(email='').annotate(email_lower=Lower('email'))
+        .values('email_lower').annotate(count=Count('id')).filter(count__gt=1)
+        .order_by('email_lower').values_list('email_lower', flat=True)
+    )
+    if not duplicates:
+        return
+    lines = []
+    for email in duplicates[:20]:
+        accounts = User.objects.filter(email__iexact=email).order_by('id').values_list('id', 'username', 'email')
+        lines.append(f"  {email}: " + ', '.join(f'#{pk} {username} <{address}>' for pk, username, address in accounts))
+    if len(duplicates) > 20:
+        lines.append(f"  ... and {len(duplicates) - 20} more")
+    raise RuntimeError(
+        f"{len(duplicates)} email address(es) are used by more than one account when compared "
+        "case-insensitively. Merge the accounts or change their emails, then migrate again:\n" + '\n'.join(lines)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('auth_app', '0002_alter_user_email_alter_user_role_alter_user_username'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicate_emails, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='user',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('email'), condition=models.Q(('email', ''), _negated=True), name='auth_app_user_email_ci_unique'),
+        ),
+    ]
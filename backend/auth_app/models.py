@@ -1,5 +1,8 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models.functions import Lower
+
+EMAIL_UNIQUE_CONSTRAINT = 'auth_app_user_email_ci_unique'
 
 class User(AbstractUser):
     ROLE_CHOICES = [
@@ -9,5 +12,11 @@ class User(AbstractUser):
 
     role = models.CharField(max_length=10, choices=ROLE_CHOICES, default='user')
 
+    class Meta(AbstractUser.Meta):
+        constraints = [
+            # Case-insensitive; blank emails (e.g. some OAuth sign-ups) may repeat
+            models.UniqueConstraint(Lower('email'), condition=~models.Q(email=''), name=EMAIL_UNIQUE_CONSTRAINT),
+        ]
+
     def __str__(self):
         return f"{self.username} ({self.get_role_display()})"
@@ -1,4 +1,6 @@
 from rest_framework import serializers
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from .authentication import ClaimsRefreshToken
 from .models import User
 
 class UserSerializer(serializers.ModelSerializer):
@@ -29,3 +31,7 @@ class UserSerializer(serializers.ModelSerializer):
         instance.role = validated_data.get('role', instance.role)
         instance.save()
         return instance
+
+
+class TokenRefreshCachedBlacklistSerializer(TokenRefreshSerializer):
+    token_class = ClaimsRefreshToken
@@ -0,0 +1,76 @@
+"""
+Token-bucket throttles for the login and register endpoints.
+
+Rates use DRF's DEFAULT_THROTTLE_RATES format ('10/min'). The number is
+the bucket size (the burst a client may send at once) and the bucket
+refills at that many requests per period. Buckets live in the default
+cache, which is shared across workers when it is Redis. The read-modify-write
+is not atomic, so concurrent requests for the same key can slip a few
+extra requests through. That is acceptable for a rate limiter.
+
+Per-IP buckets key on REMOTE_ADDR unless REST_FRAMEWORK['NUM_PROXIES'] says
+how many trusted proxies append to X-Forwarded-For. A client-supplied header
+must not pick the bucket, or a random one per request bypasses the limit.
+"""
+import hashlib
+import time
+
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        capacity, period = self.num_requests, self.duration
+        refill = capacity / period
+        now = time.time()
+        tokens, updated = self.cache.get(self.key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * refill)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self.tokens, self.refill = tokens, refill
+        self.cache.set(self.key, (tokens, now), period)
+        return allowed
+
+    def wait(self):
+        return (1 - self.tokens) / self.refill
+
+
+class IPThrottle(TokenBucketThrottle):
+    def get_ident(self, request):
+        if api_settings.NUM_PROXIES is None:
+            # DRF would take X-Forwarded-For as is
+            return request.META.get('REMOTE_ADDR')
+        return super().get_ident(request)
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
+
+
+class UsernameThrottle(TokenBucketThrottle):
+    def get_cache_key(self, request, view):
+        username = request.data.get('username') if hasattr(request.data, 'get') else None
+        if not isinstance(username, str) or not username:
+            return None
+        # Hashed: usernames may contain characters cache keys cannot
+        ident = hashlib.sha256(username.lower().encode()).hexdigest()
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+
+class LoginIPThrottle(IPThrottle):
+    scope = 'login_ip'
+
+
+class LoginUsernameThrottle(UsernameThrottle):
+    scope = 'login_username'
+
+
+class RegisterIPThrottle(IPThrottle):
+    scope = 'register_ip'
@@ -1,6 +1,8 @@
 from django.urls import path
-from .views import register, login, logout, UserListView, UserDetailView, oauth_redirect, instagram_exchange
-from rest_framework_simplejwt.views import TokenRefreshView
+from .views import (
+    register, login, logout, UserListView, UserDetailView, oauth_redirect, instagram_exchange,
+    CachedBlacklistTokenRefreshView,
+)
 
 urlpatterns = [
     path('register/', register, name='register'),
@@ -9,6 +11,6 @@ urlpatterns = [
     path('users/', UserListView.as_view(), name='user-list'),
     path('users/<int:pk>/', UserDetailView.as_view(), name='user-detail'),
     path('oauth-redirect/', oauth_redirect, name='oauth_redirect'),
-    path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('token/refresh/', CachedBlacklistTokenRefreshView.as_view(), name='token_refresh'),
     path('instagram/exchange/', instagram_exchange, name='instagram_exchange'),  # Instagram OAuth exchange endpoint
 ]
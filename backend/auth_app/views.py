@@ -1,12 +1,17 @@
 from django.shortcuts import redirect
 from django.contrib.auth import authenticate
-from .models import User
-from .serializers import UserSerializer
-from rest_framework.decorators import api_view, permission_classes
+from django.db import IntegrityError, transaction
+from .authentication import issue_tokens
+from .models import EMAIL_UNIQUE_CONSTRAINT, User
+from .throttling import LoginIPThrottle, LoginUsernameThrottle, RegisterIPThrottle
+from .blacklist import CachedBlacklistRefreshToken
+from .hashers import HashingBusy
+from .serializers import TokenRefreshCachedBlacklistSerializer, UserSerializer
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.response import Response
 from rest_framework import status, generics
 from rest_framework.permissions import AllowAny, IsAuthenticated
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.views import TokenRefreshView
 import logging
 import os
 import requests
@@ -22,6 +27,7 @@ logger = logging.getLogger(__name__)
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([RegisterIPThrottle])
 def register(request):
     username = request.data.get('username')
     email = request.data.get('email')
@@ -31,18 +37,13 @@ def register(request):
     if not all([username, email, password]):
         return Response({"error": "All fields are required"}, status=status.HTTP_400_BAD_REQUEST)
 
-    if User.objects.filter(username=username).exists():
-        return Response({"error": "Username already taken"}, status=status.HTTP_400_BAD_REQUEST)
-
-    if User.objects.filter(email=email).exists():
-        return Response({"error": "Email already taken"}, status=status.HTTP_400_BAD_REQUEST)
-
     try:
-        user = User.objects.create_user(username=username, email=email, password=password)
-        user.role = role
-        user.save()
+        # One INSERT; the unique indexes on username and lower(email) catch
+        # duplicates, including two concurrent sign-ups with the same name
+        with transaction.atomic():
+            user = User.objects.create_user(username=username, email=email, password=password, role=role)
 
-        refresh = RefreshToken.for_user(user)
+        refresh = issue_tokens(user)
         access_token = str(refresh.access_token)
 
         return Response({
@@ -51,12 +52,19 @@ def register(request):
             "refresh": str(refresh),
             "role": user.role
         }, status=status.HTTP_201_CREATED)
+    except IntegrityError as e:
+        field = 'email' if EMAIL_UNIQUE_CONSTRAINT in str(e) else 'username'
+        message = f"{field.capitalize()} already taken"
+        return Response({"error": message, field: [message]}, status=status.HTTP_400_BAD_REQUEST)
+    except HashingBusy:
+        raise
     except Exception as e:
         logger.error(f"Registration error: {str(e)}")
         return Response({"error": "An error occurred during registration"}, status=status.HTTP_400_BAD_REQUEST)
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([LoginIPThrottle, LoginUsernameThrottle])
 def login(request):
     username = request.data.get('username')
     password = request.data.get('password')
@@ -68,7 +76,7 @@ def login(request):
 
     user = authenticate(username=username, password=password)
     if user is not None:
-        refresh = RefreshToken.for_user(user)
+        refresh = issue_tokens(user)
         access_token = str(refresh.access_token)
 
         return Response({
@@ -95,7 +103,7 @@ def logout(request):
             logger.error("No refresh token provided")
             return Response({"error": "Refresh token is required for logout"}, status=400)
 
-        token = RefreshToken(refresh_token)
+        token = CachedBlacklistRefreshToken(refresh_token)
         token.blacklist()  # Blacklist the refresh token
 
         logger.info("Refresh token blacklisted successfully")
@@ -107,6 +115,9 @@ def logout(request):
         logger.error(f"Logout error: {str(e)}")
         return Response({"error": str(e)}, status=400)
 
+class CachedBlacklistTokenRefreshView(TokenRefreshView):
+    serializer_class = TokenRefreshCachedBlacklistSerializer
+
 class UserListView(generics.ListCreateAPIView):
     queryset = User.objects.all()
     serializer_class = UserSerializer
@@ -118,7 +129,6 @@ class UserDetailView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [IsAuthenticated]
 
 def oauth_redirect(backend, user, response, *args, **kwargs):
-    from rest_framework_simplejwt.tokens import RefreshToken
     from django.shortcuts import redirect
 
     logger = logging.getLogger(__name__)
@@ -132,7 +142,7 @@ def oauth_redirect(backend, user, response, *args, **kwargs):
         user.role = 'user'
         user.save()
 
-        refresh = RefreshToken.for_user(user)
+        refresh = issue_tokens(user)
         token = str(refresh.access_token)
         role = user.role
 
@@ -0,0 +1,19 @@
+"""
+ASGI config for backend project.
+
+It exposes the ASGI callable as a module-level variable named ``application``.
+Serve it with an ASGI server (e.g. ``uvicorn backend.asgi:application``) to
+hold long-lived connections such as the notification event stream.
+"""
+
+import os
+import sys
+from django.core.asgi import get_asgi_application
+
+# Add the project directory to the Python path
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+
+application = get_asgi_application()
@@ -0,0 +1,173 @@
+"""
+File responses for media, static and frontend build files.
+
+Replaces django.views.static.serve on the routes in backend/urls.py:
+
+- Strong ETag (size + mtime) and Last-Modified, answering If-None-Match /
+  If-Modified-Since with 304 before the file is opened.
+- Single byte ranges (Range / If-Range) with 206 and 416 responses.
+- Full responses go through FileResponse so the WSGI server can use its
+  sendfile-based file wrapper.
+- With SENDFILE_BACKEND set, the file body is handed to the front proxy:
+  'nginx' answers with X-Accel-Redirect to SENDFILE_NGINX_PREFIX/<root>/<path>
+  (an `internal` location aliased to the same directory), 'apache' with
+  X-Sendfile and the absolute path.
+- Names containing a content hash (main.3f2a9c1b.js) are cached for a year
+  as immutable; everything else must be revalidated, which the ETag makes cheap.
+"""
+import mimetypes
+import os
+import re
+import stat
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE_CONTROL = 'public, max-age=0, must-revalidate'
+
+# webpack/CRA style "name.<hash>.ext" or "name.<hash>.chunk.js"
+HASHED_NAME = re.compile(r'\.[0-9a-f]{8,}\.(?:chunk\.)?[A-Za-z0-9]+$')
+RANGE_HEADER = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+CHUNK_SIZE = 64 * 1024
+
+
+def file_etag(st):
+    return f'"{st.st_size:x}-{st.st_mtime_ns:x}"'
+
+
+def cache_control_for(path):
+    return IMMUTABLE_CACHE_CONTROL if HASHED_NAME.search(os.path.basename(path)) else REVALIDATE_CACHE_CONTROL
+
+
+def not_modified(request, etag, mtime):
+    """RFC 9110: If-None-Match wins over If-Modified-Since when both are sent."""
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match:
+        etags = parse_etags(if_none_match)
+        return '*' in etags or etag in etags or f'W/{etag}' in etags
+    if_modified_since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+    return if_modified_since is not None and int(mtime) <= if_modified_since
+
+
+def requested_range(request, size, etag, mtime):
+    """
+    (start, end) inclusive for a satisfiable single range, None to send the
+    whole file, or False when the range cannot be satisfied.
+    """
+    header = request.META.get('HTTP_RANGE', '')
+    match = RANGE_HEADER.match(header.strip())
+    if not match or size == 0:
+        # Multiple ranges and unknown units are optional; send everything
+        return None
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if if_range and if_range != etag and parse_http_date_safe(if_range) != int(mtime):
+        return None
+
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return False
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def read_range(path, start, end):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def sendfile_response(root_name, relative_path, full_path):
+    backend = getattr(settings, 'SENDFILE_BACKEND', '')
+    if backend == 'nginx':
+        response = HttpResponse()
+        prefix = settings.SENDFILE_NGINX_PREFIX.rstrip('/')
+        response['X-Accel-Redirect'] = f'{prefix}/{root_name}/{quote(relative_path)}'
+        return response
+    if backend == 'apache':
+        response = HttpResponse()
+        response['X-Sendfile'] = full_path
+        return response
+    return None
+
+
+def serve_file(request, path, document_root, root_name='files', cache_control=None):
+    """
+    View serving `path` from under `document_root`. `root_name` names the
+    front-proxy location the directory is exposed under for sendfile.
+    """
+    try:
+        full_path = safe_join(document_root, path)
+    except SuspiciousFileOperation:
+        raise Http404('File not found')
+    try:
+        st = os.stat(full_path)
+    except OSError:
+        raise Http404('File not found')
+    if not stat.S_ISREG(st.st_mode):
+        raise Http404('File not found')
+
+    etag = file_etag(st)
+    common_headers = {
+        'ETag': etag,
+        'Last-Modified': http_date(st.st_mtime),
+        'Cache-Control': cache_control or cache_control_for(full_path),
+    }
+
+    if not_modified(request, etag, st.st_mtime):
+        response = HttpResponseNotModified()
+        for header, value in common_headers.items():
+            response[header] = value
+        return response
+
+    content_type, encoding = mimetypes.guess_type(full_path)
+    content_type = content_type or 'application/octet-stream'
+
+    response = sendfile_response(root_name, path, full_path)
+    if response is not None:
+        # The proxy handles ranges and the body; it keeps our headers
+        response['Content-Type'] = content_type
+    elif request.method == 'HEAD':
+        response = HttpResponse(content_type=content_type)
+        response['Content-Length'] = str(st.st_size)
+    else:
+        byte_range = requested_range(request, st.st_size, etag, st.st_mtime)
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{st.st_size}'
+            return response
+        if byte_range is None:
+            response = FileResponse(open(full_path, 'rb'), content_type=content_type)
+        else:
+            start, end = byte_range
+            response = StreamingHttpResponse(read_range(full_path, start, end), status=206,
+                                             content_type=content_type)
+            response['Content-Range'] = f'bytes {start}-{end}/{st.st_size}'
+            response['Content-Length'] = str(end - start + 1)
+
+    if encoding:
+        response['Content-Encoding'] = encoding
+    response['Accept-Ranges'] = 'bytes'
+    for header, value in common_headers.items():
+        response[header] = value
+    return response
@@ -0,0 +1,159 @@
+"""
+Logging building blocks referenced from LOGGING in settings.py.
+
+- QueuedStreamHandler: request threads only enqueue records; a listener
+  thread formats and writes them, so a slow stdout/log shipper never blocks
+  a request. The queue is bounded and overflow is dropped (and counted)
+  rather than stalling the caller.
+- JsonFormatter: one JSON object per line, including any `extra=` fields.
+- SamplingFilter: keeps a fraction of the records below WARNING per logger
+  prefix, e.g. LOG_SAMPLING="backend.access=0.05".
+- RequestLogMiddleware: one structured access-log record per request on the
+  `backend.access` logger, meant to be sampled.
+"""
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+# Attributes every LogRecord has; anything else came from `extra=`
+RESERVED_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+def parse_mapping(value, cast=str):
+    """'a=1,b.c=0.5' -> {'a': cast('1'), 'b.c': cast('0.5')}"""
+    mapping = {}
+    for item in (value or '').split(','):
+        key, sep, raw = item.partition('=')
+        if sep and key.strip():
+            mapping[key.strip()] = cast(raw.strip())
+    return mapping
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in RESERVED_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry['stack'] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Pass only `rate` of the records below WARNING from loggers under each
+    configured prefix; the longest matching prefix wins. Warnings and errors
+    always pass.
+    """
+
+    def __init__(self, rates=None):
+        super().__init__()
+        self.rates = sorted((rates or {}).items(), key=lambda item: len(item[0]), reverse=True)
+
+    def rate_for(self, name):
+        for prefix, rate in self.rates:
+            if name == prefix or name.startswith(prefix + '.'):
+                return rate
+        return 1.0
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rate_for(record.name)
+        return rate >= 1.0 or random.random() < rate
+
+
+class QueuedStreamHandler(QueueHandler):
+    """
+    QueueHandler with its own listener thread writing to `stream`. The
+    formatter configured for this handler is applied by the listener, off
+    the request thread.
+    """
+
+    def __init__(self, stream=None, maxsize=10000):
+        super().__init__(queue.Queue(maxsize))
+        self.target = logging.StreamHandler(stream)
+        self.maxsize = maxsize
+        self.dropped = 0
+        self._pid = None
+        self._lock = threading.Lock()
+        self.listener = None
+        self._start()
+        atexit.register(self._stop)
+
+    def _start(self):
+        self._pid = os.getpid()
+        self.listener = QueueListener(self.queue, self.target)
+        self.listener.start()
+
+    def _stop(self):
+        if self.listener is not None and self._pid == os.getpid():
+            self.listener.stop()  # Drains what is queued
+            self.listener = None
+
+    def setFormatter(self, fmt):
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        # Resolve the message now (its args may change after this call
+        # returns) but leave formatting to the listener thread
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        if self._pid != os.getpid():
+            # Forked (e.g. gunicorn --preload): the listener thread stayed in
+            # the parent, so start a fresh queue and listener here
+            with self._lock:
+                if self._pid != os.getpid():
+                    self.queue = queue.Queue(self.maxsize)
+                    self._start()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        self._stop()
+        super().close()
+
+
+class RequestLogMiddleware:
+    """Structured access log: method, path, status and duration per request."""
+
+    logger = logging.getLogger('backend.access')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        response = self.get_response(request)
+        if self.logger.isEnabledFor(logging.INFO):
+            level = logging.WARNING if response.status_code >= 500 else logging.INFO
+            self.logger.log(level, '%s %s %s', request.method, request.path, response.status_code, extra={
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'duration_ms': round((time.perf_counter() - started) * 1000, 2),
+                'user_id': getattr(getattr(request, 'user', None), 'pk', None),
+            })
+        return response
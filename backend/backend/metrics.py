@@ -0,0 +1,191 @@
+"""
+Per-endpoint request metrics.
+
+MetricsMiddleware times every request and, per route, records into
+in-process histograms:
+
+- wall time, split into DB time (every query goes through a
+  connection.execute_wrapper), response rendering time (DRF/template
+  responses, measured around render()) and the rest of the view ("app",
+  mostly serialization)
+- DB query count, so an N+1 regression shows up as a count that grows
+- response size
+
+GET /api/metrics/ returns them in the Prometheus text format. Each worker
+process keeps its own numbers; scrape every worker, or aggregate on the
+Prometheus side. With METRICS_SERVER_TIMING (on in DEBUG) the same split is
+sent per response as a Server-Timing header, visible in browser devtools.
+"""
+import bisect
+import hmac
+import logging
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets, labels):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self.labels = tuple(labels)
+        self.lock = threading.Lock()
+        # label values -> [bucket counts..., +Inf count, sum]
+        self.series = {}
+
+    def observe(self, value, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(label_values)
+            if series is None:
+                series = self.series[label_values] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self.lock:
+            snapshot = {key: list(values) for key, values in self.series.items()}
+        for label_values, series in sorted(snapshot.items()):
+            labels = ','.join(f'{name}="{escape(value)}"' for name, value in zip(self.labels, label_values))
+            prefix = labels + ',' if labels else ''
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            cumulative += series[len(self.buckets)]
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{{labels}}} {series[-1]:.6f}')
+            lines.append(f'{self.name}_count{{{labels}}} {cumulative}')
+        return '\n'.join(lines)
+
+
+def escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+REQUEST_DURATION = Histogram('http_request_duration_seconds', 'Wall time per request.', DURATION_BUCKETS,
+                             ('route', 'method', 'status'))
+DB_DURATION = Histogram('http_request_db_duration_seconds', 'Time spent in database queries per request.',
+                        DURATION_BUCKETS, ('route', 'method'))
+DB_QUERIES = Histogram('http_request_db_queries', 'Database queries per request.', QUERY_BUCKETS,
+                       ('route', 'method'))
+RENDER_DURATION = Histogram('http_request_render_duration_seconds', 'Response rendering time per request.',
+                            DURATION_BUCKETS, ('route', 'method'))
+RESPONSE_SIZE = Histogram('http_response_size_bytes', 'Response body size.', SIZE_BUCKETS, ('route', 'method'))
+
+HISTOGRAMS = [REQUEST_DURATION, DB_DURATION, DB_QUERIES, RENDER_DURATION, RESPONSE_SIZE]
+
+
+class RequestStats:
+    __slots__ = ('queries', 'db_time', 'render_started', 'render_time')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.render_started = None
+        self.render_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries += 1
+
+
+def route_label(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    # The pattern, not the path, so ids do not explode the label set
+    return '/' + match.route if match.route else match.view_name or 'unknown'
+
+
+class MetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.server_timing = getattr(settings, 'METRICS_SERVER_TIMING', settings.DEBUG)
+
+    def __call__(self, request):
+        stats = RequestStats()
+        request._metrics = stats
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(stats))
+            response = self.get_response(request)
+        total = time.perf_counter() - started
+
+        route = route_label(request)
+        method = request.method
+        REQUEST_DURATION.observe(total, route, method, str(response.status_code))
+        DB_DURATION.observe(stats.db_time, route, method)
+        DB_QUERIES.observe(stats.queries, route, method)
+        if stats.render_time:
+            RENDER_DURATION.observe(stats.render_time, route, method)
+        size = response_size(response)
+        if size is not None:
+            RESPONSE_SIZE.observe(size, route, method)
+
+        if self.server_timing:
+            app = max(0.0, total - stats.db_time - stats.render_time)
+            response['Server-Timing'] = ', '.join([
+                f'db;dur={stats.db_time * 1000:.2f};desc="{stats.queries} queries"',
+                f'render;dur={stats.render_time * 1000:.2f}',
+                f'app;dur={app * 1000:.2f}',
+                f'total;dur={total * 1000:.2f}',
+            ])
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses render after the view returns; time that step
+        stats = getattr(request, '_metrics', None)
+        if stats is not None:
+            stats.render_started = time.perf_counter()
+
+            def rendered(response):
+                stats.render_time += time.perf_counter() - stats.render_started
+
+            response.add_post_render_callback(rendered)
+        return response
+
+
+def response_size(response):
+    if response.has_header('Content-Length'):
+        return int(response['Content-Length'])
+    if not response.streaming:
+        return len(response.content)
+    return None
+
+
+def metrics_allowed(request):
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if token:
+        provided = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
+        return hmac.compare_digest(provided, token)
+    return settings.DEBUG or request.META.get('REMOTE_ADDR') in getattr(settings, 'METRICS_ALLOWED_IPS', ())
+
+
+def metrics_view(request):
+    """Prometheus text exposition of this process's histograms."""
+    if not metrics_allowed(request):
+        return HttpResponseForbidden('Forbidden')
+    sections = [histogram.render() for histogram in HISTOGRAMS]
+    dropped = sum(getattr(handler, 'dropped', 0) for handler in logging.getLogger().handlers)
+    sections.append('# HELP log_records_dropped_total Log records dropped because the log queue was full.\n'
+                    f'# TYPE log_records_dropped_total counter\nlog_records_dropped_total {dropped}')
+    body = '\n'.join(sections) + '\n'
+    response = HttpResponse(body, content_type='text/plain; version=0.0.4; charset=utf-8')
+    response['Cache-Control'] = 'no-store'
+    return response
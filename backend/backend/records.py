@@ -0,0 +1,96 @@
+"""
+Record files for the bulk import/export commands: CSV with a header row,
+or JSON Lines (one object per line). The format comes from the file
+extension unless given explicitly.
+"""
+import csv
+import json
+import os
+
+FORMATS = ('csv', 'jsonl')
+
+
+def detect_format(path, fmt=None):
+    if fmt:
+        return fmt
+    extension = os.path.splitext(path)[1].lower().lstrip('.')
+    if extension in ('jsonl', 'ndjson'):
+        return 'jsonl'
+    if extension == 'csv':
+        return 'csv'
+    raise ValueError(f"Cannot tell the format of {path!r}; pass --format ({' or '.join(FORMATS)})")
+
+
+class RecordError(ValueError):
+    """A line of a record file that could not be parsed."""
+
+
+def read_records(path, fmt=None, report_errors=False):
+    """
+    Yield (line number, dict) pairs from a CSV or JSONL file. A line that
+    cannot be parsed raises RecordError, or with report_errors is yielded as
+    (line number, RecordError) so the caller can count it and go on.
+    """
+    fmt = detect_format(path, fmt)
+    with open(path, newline='', encoding='utf-8') as f:
+        for number, record in (read_csv(f) if fmt == 'csv' else read_jsonl(f)):
+            if isinstance(record, RecordError) and not report_errors:
+                raise record
+            yield number, record
+
+
+def read_csv(f):
+    rows = csv.DictReader(f)
+    number = 1  # Line numbers count the header as line 1
+    while True:
+        number += 1
+        try:
+            row = next(rows)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            yield number, RecordError(f'malformed CSV: {e}')
+            continue
+        yield number, {key: value for key, value in row.items() if key}
+
+
+def read_jsonl(f):
+    for number, line in enumerate(f, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield number, RecordError(f'malformed JSON: {e}')
+            continue
+        if not isinstance(record, dict):
+            yield number, RecordError('expected a JSON object')
+            continue
+        yield number, record
+
+
+def write_records(stream, fmt, fieldnames, rows):
+    """Write dicts to `stream` as they come; returns the number written."""
+    count = 0
+    if fmt == 'csv':
+        writer = csv.DictWriter(stream, fieldnames=fieldnames, extrasaction='ignore')
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    else:
+        for row in rows:
+            stream.write(json.dumps({name: row.get(name) for name in fieldnames}, default=str) + '\n')
+            count += 1
+    return count
+
+
+def batched(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -6,6 +6,7 @@ from django.core.servers.basehttp import WSGIServer
 import logging
 from datetime import timedelta
 import dj_database_url
+from backend.log import parse_mapping
 from django.http import HttpResponseRedirect
 
 # Configure logging at the top to catch early issues
@@ -89,11 +90,14 @@ INSTALLED_APPS = [
     'reviews_app',
     'issues_app',
     'notifications_app',
+    'analytics_app',
 ]
 
 # Our SSL middleware needs to be first to catch any HTTPS requests
 MIDDLEWARE = [
-    'backend.settings.SSLRedirectMiddleware',  # Custom SSL redirect must be first
+    'backend.log.RequestLogMiddleware',  # Outermost, so the logged duration covers everything
+    'backend.metrics.MetricsMiddleware',  # Per-route latency, query and size histograms (/api/metrics/)
+    'backend.settings.SSLRedirectMiddleware',  # Custom SSL redirect before everything else
     'corsheaders.middleware.CorsMiddleware',   # CORS headers should be early
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
@@ -127,6 +131,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'backend.wsgi.application'
+ASGI_APPLICATION = 'backend.asgi.application'
 
 # Custom WSGI timeout
 class CustomWSGIServer(WSGIServer):
@@ -152,6 +157,23 @@ else:
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            'OPTIONS': {
+                # SQLite ignores SELECT ... FOR UPDATE; taking the write lock
+                # when a transaction begins makes atomic booking creation
+                # serialize instead of failing with "database is locked".
+                'transaction_mode': 'IMMEDIATE',
+                # Wait up to this many seconds for a competing writer
+                # (busy_timeout) before raising "database is locked"
+                'timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT', '20')),
+                # WAL lets readers run alongside the single writer, and with
+                # WAL synchronous=NORMAL only syncs at checkpoints while
+                # staying corruption-safe
+                'init_command': (
+                    'PRAGMA journal_mode=WAL;'
+                    'PRAGMA synchronous=NORMAL;'
+                    'PRAGMA temp_store=MEMORY;'
+                ),
+            },
         }
     }
 
@@ -159,6 +181,81 @@ DATABASE_URL = os.getenv('DATABASE_URL')
 if DATABASE_URL:
     DATABASES['default'] = dj_database_url.parse(DATABASE_URL)
 
+# Connection reuse. Each worker thread keeps its connection for
+# DB_CONN_MAX_AGE seconds instead of connecting (TCP + auth) per request;
+# health checks replace a connection the server dropped before it is used.
+DATABASES['default']['CONN_MAX_AGE'] = int(os.getenv('DB_CONN_MAX_AGE', '600'))
+DATABASES['default']['CONN_HEALTH_CHECKS'] = os.getenv('DB_CONN_HEALTH_CHECKS', 'True').lower() in ('true', '1', 'yes')
+if DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql':
+    if os.getenv('DB_POOL', 'False').lower() in ('true', '1', 'yes'):
+        # psycopg 3 connection pool (requires `psycopg[pool]`), shared by the
+        # threads of a worker; Django requires persistent connections off
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default'].setdefault('OPTIONS', {})['pool'] = {
+            'min_size': int(os.getenv('DB_POOL_MIN_SIZE', '2')),
+            'max_size': int(os.getenv('DB_POOL_MAX_SIZE', '10')),
+            'timeout': int(os.getenv('DB_POOL_TIMEOUT', '10')),
+        }
+    if os.getenv('DB_PGBOUNCER', 'False').lower() in ('true', '1', 'yes'):
+        # Transaction-pooling PgBouncer hands each transaction to any server
+        # connection, so cursors must not outlive the transaction
+        DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
+
+# Cache configuration. Local memory by default (per process, LRU-culled);
+# set REDIS_URL to share cached counters and pages across workers.
+REDIS_URL = os.getenv('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        },
+        'catalog': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'catalog',
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'rentify-default',
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        },
+        # Serialized rental pages and details (rentals_app/cache.py); the
+        # least recently used entries are culled once MAX_ENTRIES is hit.
+        'catalog': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'rentify-catalog',
+            'OPTIONS': {'MAX_ENTRIES': int(os.getenv('CATALOG_CACHE_MAX_ENTRIES', '2000'))},
+        },
+    }
+CATALOG_CACHE_TTL = int(os.getenv('CATALOG_CACHE_TTL', '300'))
+
+# Per-user unread notification counters (notifications_app/counters.py).
+# With the per-process local-memory cache, counters in other workers can
+# lag by at most this many seconds before being rebuilt from the database.
+NOTIFICATION_UNREAD_TTL = int(os.getenv('NOTIFICATION_UNREAD_TTL', '300' if REDIS_URL else '30'))
+
+# Password hashing runs on a bounded per-process pool (auth_app/hashers.py).
+# Changing PASSWORD_HASH_ITERATIONS rehashes each password on its next login.
+PASSWORD_HASHERS = [
+    'auth_app.hashers.PooledPBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+PASSWORD_HASH_ITERATIONS = int(os.getenv('PASSWORD_HASH_ITERATIONS', '0')) or None  # None: Django's default
+AUTH_HASH_WORKERS = int(os.getenv('AUTH_HASH_WORKERS', '2'))
+# Every hash running or queued holds a request thread, so by default the
+# pool admits one fewer than the worker's GUNICORN_THREADS (gunicorn.conf.py)
+# and sign-in bursts beyond that get a 503 instead of every thread
+AUTH_HASH_QUEUE = int(os.getenv('AUTH_HASH_QUEUE')
+                      or max(0, int(os.getenv('GUNICORN_THREADS', '4')) - AUTH_HASH_WORKERS - 1))
+AUTH_HASH_WAIT = float(os.getenv('AUTH_HASH_WAIT', '2'))
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -192,6 +289,36 @@ MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 os.makedirs(MEDIA_ROOT, exist_ok=True)
 
+# Responsive derivatives of rental images (rentals_app/images.py). Workers
+# are background threads in each web process; 0 renders in the request
+# thread right after commit.
+RENTAL_THUMBNAIL_WIDTHS = tuple(
+    int(w) for w in os.getenv('RENTAL_THUMBNAIL_WIDTHS', '320,640,1024').split(',') if w.strip()
+)
+RENTAL_THUMBNAIL_WORKERS = int(os.getenv('RENTAL_THUMBNAIL_WORKERS', '1'))
+
+# File handoff to a front proxy for media/static/build files
+# (backend/fileserving.py): '' streams from Django, 'nginx' answers with
+# X-Accel-Redirect to SENDFILE_NGINX_PREFIX/<root name>/<path> (media, static,
+# products or frontend; see backend/urls.py),
+# 'apache' with X-Sendfile.
+SENDFILE_BACKEND = os.getenv('SENDFILE_BACKEND', '').lower()
+SENDFILE_NGINX_PREFIX = os.getenv('SENDFILE_NGINX_PREFIX', '/internal')
+
+# How often (seconds) the in-memory frontend shell/CSS/JS cache in
+# backend/spa.py looks for a new build. Installing the optional `brotli`
+# package adds br-encoded variants next to gzip.
+FRONTEND_CACHE_RECHECK = float(os.getenv('FRONTEND_CACHE_RECHECK', '2' if DEBUG else '60'))
+
+# Request metrics (backend/metrics.py). /api/metrics/ requires
+# "Authorization: Bearer <METRICS_TOKEN>" when a token is set; otherwise it
+# only answers in DEBUG or to the addresses in METRICS_ALLOWED_IPS
+# (comma-separated REMOTE_ADDR values; empty by default, since behind a
+# same-host proxy every client appears as 127.0.0.1).
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+METRICS_ALLOWED_IPS = [ip.strip() for ip in os.getenv('METRICS_ALLOWED_IPS', '').split(',') if ip.strip()]
+METRICS_SERVER_TIMING = os.getenv('METRICS_SERVER_TIMING', str(DEBUG)).lower() in ('true', '1', 'yes')
+
 # Whitenoise configuration - use a simpler storage for development
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedStaticFilesStorage'
 
@@ -254,8 +381,10 @@ CSRF_TRUSTED_ORIGINS = [
 
 # Django REST framework settings
 REST_FRAMEWORK = {
+    # Read-only requests are authenticated from the token's claims, without a
+    # user query; see auth_app/authentication.py
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'auth_app.authentication.ClaimsJWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',  # Add session auth for browser testing
     ),
     'DEFAULT_PERMISSION_CLASSES': (
@@ -273,6 +402,16 @@ REST_FRAMEWORK = {
         'rest_framework.parsers.MultiPartParser',
     ),
     'EXCEPTION_HANDLER': 'rest_framework.views.exception_handler',
+    # Throttles identify clients by REMOTE_ADDR. Behind N reverse proxies that
+    # each append to X-Forwarded-For, set NUM_PROXIES=N so the address the
+    # outermost proxy saw is used; the header is never trusted otherwise.
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', '0')),
+    # Token buckets for auth_app/throttling.py: burst size / refill period
+    'DEFAULT_THROTTLE_RATES': {
+        'login_ip': os.getenv('THROTTLE_LOGIN_IP', '30/min'),
+        'login_username': os.getenv('THROTTLE_LOGIN_USERNAME', '10/min'),
+        'register_ip': os.getenv('THROTTLE_REGISTER_IP', '10/hour'),
+    },
 }
 
 # Authentication backends
@@ -327,8 +466,42 @@ else:
 
 AUTH_USER_MODEL = 'auth_app.User'
 
+# Seconds a full user row stays cached for token-authenticated writes
+AUTH_USER_CACHE_TTL = int(os.getenv('AUTH_USER_CACHE_TTL', '30'))
+# Seconds between syncs of the in-memory refresh token blacklist
+# (auth_app/blacklist.py); 0 checks the database on every refresh
+AUTH_BLACKLIST_REFRESH = int(os.getenv('AUTH_BLACKLIST_REFRESH', '5'))
+
+# Notification and email delivery (see notifications_app/dispatch.py).
+# ThreadPoolDispatcher writes from in-process worker threads; switch to
+# notifications_app.dispatch.OutboxDispatcher and run
+# `manage.py run_notification_worker` for durable delivery.
+NOTIFICATION_DISPATCHER = os.getenv('NOTIFICATION_DISPATCHER', 'notifications_app.dispatch.ThreadPoolDispatcher')
+NOTIFICATION_WORKERS = int(os.getenv('NOTIFICATION_WORKERS', '2'))
+NOTIFICATION_BATCH_SIZE = int(os.getenv('NOTIFICATION_BATCH_SIZE', '100'))
+NOTIFICATION_BATCH_WAIT = float(os.getenv('NOTIFICATION_BATCH_WAIT', '0.05'))
+# Failed messages are retried after NOTIFICATION_RETRY_DELAY seconds,
+# doubling each time (ThreadPoolDispatcher only; the outbox has its own)
+NOTIFICATION_MAX_ATTEMPTS = int(os.getenv('NOTIFICATION_MAX_ATTEMPTS', '3'))
+NOTIFICATION_RETRY_DELAY = float(os.getenv('NOTIFICATION_RETRY_DELAY', '1'))
+
+# Push channel for new notifications (notifications_app/stream.py). The
+# in-process broker only reaches clients connected to the same process;
+# waiting clients re-read the table every NOTIFICATION_RECHECK_INTERVAL
+# seconds to pick up notifications created by other workers.
+NOTIFICATION_BROKER = os.getenv('NOTIFICATION_BROKER', 'notifications_app.broker.InProcessBroker')
+NOTIFICATION_RECHECK_INTERVAL = float(os.getenv('NOTIFICATION_RECHECK_INTERVAL', '5'))
+NOTIFICATION_STREAM_KEEPALIVE = int(os.getenv('NOTIFICATION_STREAM_KEEPALIVE', '15'))
+NOTIFICATION_STREAM_RETRY_MS = int(os.getenv('NOTIFICATION_STREAM_RETRY_MS', '5000'))
+# Seconds a stream ticket stays valid; each ticket opens one connection
+NOTIFICATION_STREAM_TICKET_TTL = int(os.getenv('NOTIFICATION_STREAM_TICKET_TTL', '30'))
+NOTIFICATION_LONG_POLL_TIMEOUT = int(os.getenv('NOTIFICATION_LONG_POLL_TIMEOUT', '25'))
+# Under WSGI the poll endpoint does not wait; clients re-poll this often
+NOTIFICATION_POLL_INTERVAL = int(os.getenv('NOTIFICATION_POLL_INTERVAL', '30'))
+
 APPEND_SLASH = True
-SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+# Session reads come from the default cache and fall back to the database
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
 
 # SECURITY SETTINGS - ONE PLACE FOR ALL HTTPS/HTTP CONFIGURATION
 # In development, forcefully disable all HTTPS-related security settings
@@ -358,43 +531,60 @@ else:
 USE_X_FORWARDED_HOST = True
 USE_X_FORWARDED_PORT = True
 
-# Logging configuration
+# Logging configuration. Records pass through a bounded queue to a listener
+# thread (backend/log.py), written as JSON lines unless LOG_FORMAT=text.
+#   LOG_LEVEL=INFO                          root level
+#   LOG_LEVELS=django.db.backends=DEBUG     per-logger levels
+#   LOG_SAMPLING=backend.access=0.1         share of sub-WARNING records kept
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'text' if DEBUG else 'json')
+LOG_SAMPLING = parse_mapping(os.getenv('LOG_SAMPLING', '' if DEBUG else 'backend.access=0.1'), float)
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
+    'formatters': {
+        'json': {
+            '()': 'backend.log.JsonFormatter',
+        },
+        'text': {
+            'format': '%(asctime)s %(levelname)s %(name)s: %(message)s',
+        },
+    },
+    'filters': {
+        'sampling': {
+            '()': 'backend.log.SamplingFilter',
+            'rates': LOG_SAMPLING,
+        },
+    },
     'handlers': {
         'console': {
-            'class': 'logging.StreamHandler',
+            '()': 'backend.log.QueuedStreamHandler',
+            'stream': 'ext://sys.stdout',
+            'formatter': LOG_FORMAT,
+            'filters': ['sampling'],
         },
     },
+    'root': {
+        'handlers': ['console'],
+        'level': os.getenv('LOG_LEVEL', 'INFO'),
+    },
     'loggers': {
         'django': {
-            'handlers': ['console'],
             'level': os.getenv('DJANGO_LOG_LEVEL', 'INFO'),
         },
         'social_django': {
-            'handlers': ['console'],
             'level': 'DEBUG' if DEBUG else 'INFO',
         },
-        'django.request': {
-            'handlers': ['console'],
-            'level': 'DEBUG' if DEBUG else 'INFO',
-            'propagate': False,
+        **{
+            name: {'level': level.upper()}
+            for name, level in parse_mapping(os.getenv('LOG_LEVELS')).items()
         },
     },
 }
 
 # Debug logging for static files (only in DEBUG mode)
 if DEBUG:
-    # Set up detailed logging for static files
-    staticfiles_logger = logging.getLogger('django.contrib.staticfiles')
-    staticfiles_logger.setLevel(logging.DEBUG)
-    staticfiles_logger.addHandler(logging.StreamHandler())
-    
-    # Add WhiteNoise logging for detailed static file serving info
-    whitenoise_logger = logging.getLogger('whitenoise')
-    whitenoise_logger.setLevel(logging.DEBUG)
-    whitenoise_logger.addHandler(logging.StreamHandler())
+    LOGGING['loggers'].setdefault('django.contrib.staticfiles', {'level': 'DEBUG'})
+    LOGGING['loggers'].setdefault('whitenoise', {'level': 'DEBUG'})
     
     # Log static file configuration
     logger.info(f"Static files configuration:")
@@ -404,13 +594,3 @@ if DEBUG:
     logger.info(f"WHITENOISE_ROOT: {WHITENOISE_ROOT}")
     logger.info(f"Frontend build dir exists: {os.path.exists(os.path.join(BASE_DIR, '..', 'frontend', 'build'))}")
     logger.info(f"dist dir exists: {os.path.exists(os.path.join(BASE_DIR, '..', 'frontend', 'build', 'dist'))}")
-    
-    # Log every static file request
-    def log_static_request(sender, **kwargs):
-        request = kwargs.get('request')
-        if request and request.path.startswith(('/static/', '/dist/')):
-            logger.debug(f"Static file request: {request.path}")
-    
-    # Use request_started signal from django.core.signals
-    from django.core.signals import request_started
-    request_started.connect(log_static_request)
\ No newline at end of file
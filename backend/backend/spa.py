@@ -0,0 +1,156 @@
+"""
+In-memory cache for the frontend shell (index.html) and its main CSS/JS.
+
+Each asset is located once, read once and compressed once (gzip, plus
+brotli when the optional `brotli` package is installed); requests are then
+answered from memory with the best encoding the client accepts. The file
+location and mtime are rechecked at most every FRONTEND_CACHE_RECHECK
+seconds, so a new build is picked up without a restart while a busy
+catch-all route costs no filesystem calls in between.
+"""
+import gzip
+import hashlib
+import logging
+import mimetypes
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date, parse_etags
+
+from .fileserving import cache_control_for
+
+try:
+    import brotli
+except ImportError:  # Optional: gzip only
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Smaller bodies fit in a packet or two; compressing them gains nothing
+MIN_COMPRESS_SIZE = 512
+
+
+def accepted_encodings(request):
+    """Codings the client accepts (q > 0), e.g. {'br', 'gzip'}."""
+    accepted = set()
+    for part in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        coding, _, params = part.strip().partition(';')
+        params = params.replace(' ', '')
+        if params.startswith('q=') and params[2:] in ('0', '0.0', '0.00', '0.000'):
+            continue
+        if coding:
+            accepted.add(coding.lower())
+    return accepted
+
+
+class CachedAsset:
+    def __init__(self, path, mtime_ns, content, content_type, cache_control):
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.content_type = content_type
+        self.cache_control = cache_control
+        self.last_modified = http_date(mtime_ns / 1e9)
+        digest = hashlib.sha1(content).hexdigest()[:16]
+        # identity first so it is the fallback; each coding gets its own ETag
+        self.variants = {'identity': (content, f'"{digest}"')}
+        if len(content) >= MIN_COMPRESS_SIZE:
+            compressed = gzip.compress(content, compresslevel=9, mtime=0)
+            if len(compressed) < len(content):
+                self.variants['gzip'] = (compressed, f'"{digest}-gzip"')
+            if brotli is not None:
+                compressed = brotli.compress(content, quality=11)
+                if len(compressed) < len(content):
+                    self.variants['br'] = (compressed, f'"{digest}-br"')
+
+    @classmethod
+    def load(cls, path, cache_control=None):
+        with open(path, 'rb') as f:
+            mtime_ns = os.fstat(f.fileno()).st_mtime_ns
+            content = f.read()
+        content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        if content_type.startswith('text/') or content_type == 'application/javascript':
+            content_type += '; charset=utf-8'
+        return cls(path, mtime_ns, content, content_type, cache_control or cache_control_for(path))
+
+    def pick(self, request):
+        accepted = accepted_encodings(request)
+        for coding in ('br', 'gzip'):
+            if coding in self.variants and coding in accepted:
+                return coding
+        return 'identity'
+
+    def response(self, request):
+        coding = self.pick(request)
+        body, etag = self.variants[coding]
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match and (etag in parse_etags(if_none_match) or '*' in parse_etags(if_none_match)):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(b'' if request.method == 'HEAD' else body, content_type=self.content_type)
+            response['Content-Length'] = str(len(body))
+            if coding != 'identity':
+                response['Content-Encoding'] = coding
+        response['ETag'] = etag
+        response['Last-Modified'] = self.last_modified
+        response['Cache-Control'] = self.cache_control
+        if len(self.variants) > 1:
+            patch_vary_headers(response, ('Accept-Encoding',))
+        return response
+
+
+class AssetCache:
+    """
+    One frontend asset. `locate` returns its current path (or None when it
+    does not exist); it is only called when the recheck interval has passed.
+    """
+
+    def __init__(self, locate, cache_control=None):
+        self.locate = locate
+        self.cache_control = cache_control
+        self.asset = None
+        self.checked_at = None
+        self.lock = threading.Lock()
+
+    def recheck_interval(self):
+        return getattr(settings, 'FRONTEND_CACHE_RECHECK', 2 if settings.DEBUG else 60)
+
+    def get(self):
+        """The cached asset, reloaded if its location or mtime changed; None if missing."""
+        now = time.monotonic()
+        if self.checked_at is not None and now - self.checked_at < self.recheck_interval():
+            return self.asset
+        with self.lock:
+            if self.checked_at is not None and now - self.checked_at < self.recheck_interval():
+                return self.asset
+            self.asset = self.refresh()
+            self.checked_at = time.monotonic()
+            return self.asset
+
+    def refresh(self):
+        path = self.locate()
+        if path is None:
+            return None
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+            if self.asset and self.asset.path == path and self.asset.mtime_ns == mtime_ns:
+                return self.asset
+            asset = CachedAsset.load(path, self.cache_control)
+        except OSError as e:
+            logger.error("Could not load frontend asset %s: %s", path, e)
+            return None
+        logger.info("Loaded frontend asset %s (%s)", path, ', '.join(asset.variants))
+        return asset
+
+
+def first_existing(*paths):
+    """locate() helper: the first of `paths` that exists."""
+    def locate():
+        for path in paths:
+            if os.path.isfile(path):
+                return path
+        return None
+    return locate
@@ -0,0 +1,18 @@
+"""
+Transaction helpers for the bench_* and check_* management commands.
+"""
+from contextlib import contextmanager
+
+from django.db import transaction
+
+
+@contextmanager
+def rolled_back(using=None):
+    """
+    Run the block in a transaction that is rolled back when it ends, so the
+    data a command seeds to measure against is never committed. Results the
+    block computes are ordinary local variables and outlive it.
+    """
+    with transaction.atomic(using=using):
+        yield
+        transaction.set_rollback(True, using=using)
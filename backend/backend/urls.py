@@ -4,7 +4,9 @@ from django.urls import path, include, re_path
 from django.conf import settings
 from django.conf.urls.static import static
 from django.views.generic import TemplateView
-from django.views.static import serve
+from .fileserving import serve_file
+from .metrics import metrics_view
+from .spa import AssetCache, first_existing
 from django.http import HttpResponse, JsonResponse, HttpResponseRedirect
 import logging
 import mimetypes
@@ -15,6 +17,10 @@ mimetypes.add_type("application/javascript", ".js")
 
 logger = logging.getLogger('django')
 
+FRONTEND_BUILD_DIR = os.path.join(settings.BASE_DIR, '..', 'frontend', 'build')
+FRONTEND_DIST_DIR = os.path.join(settings.BASE_DIR, '..', 'frontend', 'dist')
+PRODUCTS_DIR = os.path.join(settings.BASE_DIR, '..', 'products')
+
 # API documentation view
 def api_docs(request):
     return JsonResponse({
@@ -26,102 +32,73 @@ def api_docs(request):
             "bookings": "/api/bookings/",
             "reviews": "/api/reviews/",
             "issues": "/api/issues/",
-            "notifications": "/api/notifications/"
+            "notifications": "/api/notifications/",
+            "analytics": "/api/analytics/",
+            "metrics": "/api/metrics/"
         }
     })
 
 # Health check endpoint
 def health_check(request):
-    logger.info("Health check endpoint accessed")
+    # Probed every few seconds; the sampled access log already records it
     return JsonResponse({"status": "OK", "message": "Server is running"})
 
+def locate_main_js():
+    # First look for files matching the webpack pattern, then bundle.js
+    js_dir = os.path.join(FRONTEND_BUILD_DIR, 'static', 'js')
+    try:
+        names = sorted(os.listdir(js_dir))
+    except OSError:
+        return None
+    for name in names:
+        if name.startswith('main.') and name.endswith('.js'):
+            return os.path.join(js_dir, name)
+    if 'bundle.js' in names:
+        return os.path.join(js_dir, 'bundle.js')
+    return None
+
+
+# Frontend shell and entry assets, held in memory with precompressed variants
+# (backend/spa.py) and re-resolved only every FRONTEND_CACHE_RECHECK seconds
+index_asset = AssetCache(first_existing(os.path.join(FRONTEND_BUILD_DIR, 'index.html')),
+                         cache_control='no-cache')
+css_asset = AssetCache(first_existing(
+    os.path.join(FRONTEND_BUILD_DIR, 'dist', 'output.css'),
+    os.path.join(FRONTEND_DIST_DIR, 'output.css'),
+    os.path.join(FRONTEND_BUILD_DIR, 'static', 'css', 'output.css'),
+    os.path.join(settings.STATIC_ROOT, 'css', 'output.css'),
+    os.path.join(settings.STATIC_ROOT, 'dist', 'output.css'),
+))
+js_asset = AssetCache(locate_main_js)
+
 # Special direct handler for CSS files that doesn't redirect
 def serve_css(request):
-    # Extract path from request
-    path = request.path.lstrip('/')
-    logger.info(f"CSS direct handler for: {path}")
-    
-    # Get query parameters (for cache busting)
-    query_params = request.META.get('QUERY_STRING', '')
-    if query_params:
-        logger.info(f"CSS query params: {query_params}")
-    
-    # Try multiple locations for output.css
-    possible_paths = [
-        os.path.join(settings.BASE_DIR, '..', 'frontend', 'build', 'dist', 'output.css'),
-        os.path.join(settings.BASE_DIR, '..', 'frontend', 'dist', 'output.css'),
-        os.path.join(settings.BASE_DIR, '..', 'frontend', 'build', 'static', 'css', 'output.css'),
-        os.path.join(settings.STATIC_ROOT, 'css', 'output.css'),
-        os.path.join(settings.STATIC_ROOT, 'dist', 'output.css')
-    ]
-    
-    # Find the first existing CSS file
-    css_path = None
-    for path in possible_paths:
-        if os.path.exists(path):
-            css_path = path
-            logger.info(f"Found CSS at: {css_path}")
-            break
-    
-    if css_path:
-        try:
-            with open(css_path, 'r') as f:
-                css_content = f.read()
-            
-            # Return the CSS with appropriate headers
-            response = HttpResponse(css_content, content_type='text/css')
-            response['Cache-Control'] = 'no-cache, must-revalidate'
-            response['Pragma'] = 'no-cache'
-            response['Expires'] = '0'
-            response['Access-Control-Allow-Origin'] = '*'
-            
-            # Log successful response
-            logger.info(f"CSS served successfully from {css_path}")
-            return response
-        except Exception as e:
-            logger.error(f"Error reading CSS file: {str(e)}")
-            return HttpResponse(f'/* Error loading CSS: {str(e)} */', content_type='text/css')
+    asset = css_asset.get()
+    if asset:
+        # Unhashed name: revalidated on every load, answered with 304 while the ETag matches
+        response = asset.response(request)
+        response['Access-Control-Allow-Origin'] = '*'
+        return response
     else:
         logger.error("CSS file not found in any location")
         return HttpResponse('/* CSS file not found */', content_type='text/css')
 
 # Enhanced JS bundler handler with better error handling
 def serve_bundle_js(request):
-    logger.info("JS file requested via custom handler")
-    
-    # Try to find the main JS file in the React build
-    js_dir = os.path.join(settings.BASE_DIR, '..', 'frontend', 'build', 'static', 'js')
-    main_js_file = None
-    
-    if os.path.exists(js_dir):
-        # First look for files matching the webpack pattern
-        for file in os.listdir(js_dir):
-            if file.startswith('main.') and file.endswith('.js'):
-                main_js_file = file
-                break
-        
-        # Fallback to looking for bundle.js
-        if not main_js_file:
-            if 'bundle.js' in os.listdir(js_dir):
-                main_js_file = 'bundle.js'
-    
-    if main_js_file:
-        js_path = os.path.join(js_dir, main_js_file)
-        logger.info(f"Serving JS from: {js_path}")
-        try:
-            with open(js_path, 'r') as f:
-                js_content = f.read()
-            response = HttpResponse(js_content, content_type='application/javascript')
-            response['Cache-Control'] = 'no-cache, must-revalidate'
-            response['Access-Control-Allow-Origin'] = '*'
-            return response
-        except Exception as e:
-            logger.error(f"Error reading JS file: {str(e)}")
-            return HttpResponse(f'console.error("Error loading bundle: {str(e)}");', 
-                              content_type='application/javascript')
+    asset = js_asset.get()
+    requested = os.path.basename(request.path)
+    if asset and requested not in ('bundle.js', os.path.basename(asset.path)):
+        # An older or newer build's hashed bundle: only ever serve the file
+        # actually named, since it is cached as immutable
+        return serve_file(request, f'static/js/{requested}', FRONTEND_BUILD_DIR, root_name='frontend')
+    if asset:
+        # main.<hash>.js is cached as immutable; bundle.js is revalidated
+        response = asset.response(request)
+        response['Access-Control-Allow-Origin'] = '*'
+        return response
     else:
         if settings.DEBUG:
-            logger.info("JS file not found, proxying to webpack dev server")
+            logger.debug("JS file not found, proxying to webpack dev server")
             return HttpResponse(
                 'console.log("Bundle not found in Django static files");', 
                 content_type='application/javascript'
@@ -133,17 +110,9 @@ def serve_bundle_js(request):
 
 # Advanced serve_index handler that respects React Router
 def serve_index(request):
-    logger.info(f"Serving index.html for path: {request.path}")
-    index_path = os.path.join(settings.BASE_DIR, '..', 'frontend', 'build', 'index.html')
-    
-    if os.path.exists(index_path):
-        try:
-            with open(index_path, 'r') as f:
-                content = f.read()
-            return HttpResponse(content, content_type='text/html')
-        except Exception as e:
-            logger.error(f"Error reading index.html: {str(e)}")
-            return HttpResponse(f"Error loading React app: {str(e)}", content_type='text/html')
+    asset = index_asset.get()
+    if asset:
+        return asset.response(request)
     else:
         if settings.DEBUG:
             return HttpResponse(
@@ -168,6 +137,7 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/docs/', api_docs, name='api_docs'),
     path('api/health/', health_check, name='health_check'),
+    path('api/metrics/', metrics_view, name='metrics'),
     
     # API routing
     path('api/auth/', include('auth_app.urls')),
@@ -176,6 +146,7 @@ urlpatterns = [
     path('api/reviews/', include('reviews_app.urls')),
     path('api/issues/', include('issues_app.urls')),
     path('api/notifications/', include('notifications_app.urls')),
+    path('api/analytics/', include('analytics_app.urls')),
     
     # Legacy API paths (keep for backward compatibility)
     path('api/', include('auth_app.urls')),
@@ -211,23 +182,26 @@ urlpatterns = urlpatterns + js_patterns
 # Media and static files
 media_static_patterns = [
     # Media files
-    re_path(r'^media/(?P<path>.*)$', serve, {'document_root': settings.MEDIA_ROOT}),
+    re_path(r'^media/(?P<path>.*)$', serve_file, {'document_root': settings.MEDIA_ROOT, 'root_name': 'media'}),
     
     # Static files
-    re_path(r'^static/(?P<path>.*)$', serve, {'document_root': settings.STATIC_ROOT}),
+    re_path(r'^static/(?P<path>.*)$', serve_file, {'document_root': settings.STATIC_ROOT, 'root_name': 'static'}),
     
     # Products images
-    re_path(r'^products/(?P<path>.*)$', serve, {
-        'document_root': os.path.join(settings.BASE_DIR, '..', 'products')
+    re_path(r'^products/(?P<path>.*)$', serve_file, {
+        'document_root': PRODUCTS_DIR,
+        'root_name': 'products',
     }),
     
     # Special route for handling manifest.json and favicon.ico
-    path('manifest.json', serve, {
-        'document_root': os.path.join(settings.BASE_DIR, '..', 'frontend', 'build'),
+    path('manifest.json', serve_file, {
+        'document_root': FRONTEND_BUILD_DIR,
+        'root_name': 'frontend',
         'path': 'manifest.json'
     }),
-    path('favicon.ico', serve, {
-        'document_root': os.path.join(settings.BASE_DIR, '..', 'frontend', 'build'),
+    path('favicon.ico', serve_file, {
+        'document_root': FRONTEND_BUILD_DIR,
+        'root_name': 'frontend',
         'path': 'favicon.ico'
     }),
 ]
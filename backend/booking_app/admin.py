@@ -1,4 +1,20 @@
 from django.contrib import admin
+from .export import export_response
 from .models import Booking
 
-admin.site.register(Booking)
+
+@admin.register(Booking)
+class BookingAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'rental', 'start_date', 'end_date', 'total_price', 'payment_status')
+    list_filter = ('payment_status', 'payment_method', 'start_date')
+    list_select_related = ('user', 'rental')
+    date_hierarchy = 'start_date'
+    actions = ['export_csv', 'export_jsonl']
+
+    @admin.action(description="Export selected bookings as CSV")
+    def export_csv(self, request, queryset):
+        return export_response(request, queryset, 'csv')
+
+    @admin.action(description="Export selected bookings as JSONL")
+    def export_jsonl(self, request, queryset):
+        return export_response(request, queryset, 'jsonl')
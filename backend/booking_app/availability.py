@@ -0,0 +1,48 @@
+from django.db.models import Exists, OuterRef
+
+from rentals_app.models import Rental
+from .models import Booking
+
+
+def overlapping_bookings(rental_id, start_date, end_date, exclude_booking_id=None):
+    """
+    Bookings for a rental whose date range overlaps [start_date, end_date].
+
+    Both ends are inclusive, matching how total_price counts days. The
+    end_date predicate comes first so the (rental, end_date, start_date)
+    index seeks straight past historical bookings that ended before the
+    requested window instead of scanning the rental's whole history.
+    """
+    queryset = Booking.objects.filter(
+        rental_id=rental_id,
+        end_date__gte=start_date,
+        start_date__lte=end_date,
+    )
+    if exclude_booking_id is not None:
+        queryset = queryset.exclude(id=exclude_booking_id)
+    return queryset
+
+
+def is_rental_free(rental_id, start_date, end_date, exclude_booking_id=None):
+    """Return True when no booking for the rental overlaps the requested dates."""
+    return not overlapping_bookings(
+        rental_id, start_date, end_date, exclude_booking_id=exclude_booking_id
+    ).exists()
+
+
+def available_rentals(start_date, end_date, category=None):
+    """
+    Listed rentals with no booking overlapping [start_date, end_date].
+
+    Built as a single anti-join (NOT EXISTS) so the database answers the
+    whole window in one query, probing the booking date index per rental.
+    """
+    conflicts = Booking.objects.filter(
+        rental=OuterRef('pk'),
+        end_date__gte=start_date,
+        start_date__lte=end_date,
+    )
+    queryset = Rental.objects.filter(is_available=True)
+    if category:
+        queryset = queryset.filter(category=category)
+    return queryset.filter(~Exists(conflicts))
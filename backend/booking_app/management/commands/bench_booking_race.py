@@ -0,0 +1,113 @@
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from auth_app.models import User
+from booking_app.models import Booking
+from booking_app.views import BookingListCreateView
+from notifications_app.dispatch import get_dispatcher
+from rentals_app.models import Rental
+
+
+class Command(BaseCommand):
+    help = (
+        'Fire concurrent booking requests at a handful of rentals, verify that no two '
+        'bookings for the same rental overlap and report throughput. '
+        'The rentals, user and bookings it creates are deleted afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--threads', type=int, default=50)
+        parser.add_argument('--rentals', type=int, default=3)
+        parser.add_argument('--horizon-days', type=int, default=60,
+                            help='Bookings are spread over this many days, so most of them collide.')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        random.seed(options['seed'])
+        user = User.objects.create_user(username=f'bench-race-{int(time.time())}', password=None)
+        rentals = [
+            Rental.objects.create(
+                name=f'Race rental {i}', category='Bench', details='Seeded by bench_booking_race',
+                price=10, image='rentals/doge.jpg',
+            )
+            for i in range(options['rentals'])
+        ]
+        try:
+            statuses, elapsed = self.fire(user, rentals, options)
+            overlaps = self.count_overlaps(rentals)
+        finally:
+            # Let the dispatcher threads write the booking notifications
+            # before their user and rentals go away
+            flush = getattr(get_dispatcher(), 'flush', None)
+            if flush is not None:
+                flush()
+            Rental.objects.filter(id__in=[r.id for r in rentals]).delete()
+            user.delete()
+
+        total = sum(statuses.values())
+        self.stdout.write(
+            f'{total} requests in {elapsed:.2f}s ({total / elapsed:.1f} req/s) across '
+            f'{options["threads"]} threads: ' + ', '.join(f'{code}={n}' for code, n in sorted(statuses.items()))
+        )
+        self.stdout.write(f'Created {statuses.get(201, 0)} bookings ({statuses.get(201, 0) / elapsed:.1f}/s)')
+        unexpected = {code: n for code, n in statuses.items() if code not in (201, 400)}
+        if overlaps:
+            raise CommandError(f'{overlaps} overlapping booking pairs found')
+        if unexpected:
+            raise CommandError(f'Unexpected responses: {unexpected}')
+        self.stdout.write(self.style.SUCCESS('No overlapping bookings'))
+
+    def fire(self, user, rentals, options):
+        factory = APIRequestFactory()
+        view = BookingListCreateView.as_view()
+        today = date.today()
+        payloads = []
+        for _ in range(options['requests']):
+            start = today + timedelta(days=random.randint(1, options['horizon_days']))
+            end = start + timedelta(days=random.randint(0, 5))
+            payloads.append({
+                'rental': random.choice(rentals).id,
+                'start_date': start.isoformat(),
+                'end_date': end.isoformat(),
+                'total_price': '10',
+                'payment_method': 'Physical',
+            })
+
+        statuses = Counter()
+        lock = threading.Lock()
+
+        def post(payload):
+            try:
+                request = factory.post('/api/bookings/', payload, format='json')
+                force_authenticate(request, user=user)
+                code = view(request).status_code
+            finally:
+                connection.close()
+            with lock:
+                statuses[code] += 1
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['threads']) as pool:
+            list(pool.map(post, payloads))
+        return statuses, time.perf_counter() - started
+
+    def count_overlaps(self, rentals):
+        overlaps = 0
+        for rental in rentals:
+            bookings = list(
+                Booking.objects.filter(rental=rental).order_by('start_date').values_list('start_date', 'end_date')
+            )
+            # Sorted by start date, any overlap shows up between neighbours
+            for (_, prev_end), (start, _) in zip(bookings, bookings[1:]):
+                if start <= prev_end:
+                    overlaps += 1
+        return overlaps
@@ -0,0 +1,84 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from auth_app.models import User
+from backend.transactions import rolled_back
+from booking_app.models import Booking
+from booking_app.views import (
+    ActiveBookingsView,
+    BookingDetailView,
+    BookingListCreateView,
+    PaymentHistoryView,
+    RentalHistoryView,
+)
+from rentals_app.models import Rental
+
+ENDPOINTS = {
+    'list': (BookingListCreateView, '/api/bookings/'),
+    'active': (ActiveBookingsView, '/api/bookings/active/'),
+    'history': (RentalHistoryView, '/api/bookings/history/'),
+    'payments': (PaymentHistoryView, '/api/bookings/payments/'),
+    'detail': (BookingDetailView, '/api/bookings/{pk}/'),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Count the queries each booking endpoint runs for a nearly empty page '
+        'and a full one, with and without ?expand=rental, and fail if the count '
+        'grows with the page. The seed data is rolled back.'
+    )
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            user = User.objects.create_user(username='check-booking-queries', password=None)
+            small = self.measure(user, bookings=2)
+            large = self.measure(user, bookings=20)
+
+        failures = []
+        for key in small:
+            label = '{} {}'.format(*key).strip()
+            if small[key] != large[key]:
+                failures.append(label)
+                self.stdout.write(self.style.ERROR(f'N+1  {label}: {small[key]} -> {large[key]} queries'))
+            else:
+                self.stdout.write(f'ok   {label}: {small[key]} queries')
+
+        if failures:
+            raise CommandError(f'{len(failures)} endpoint(s) run a query per booking')
+        self.stdout.write(self.style.SUCCESS('Every booking endpoint runs a constant number of queries'))
+
+    def measure(self, user, bookings):
+        Booking.objects.filter(user=user).delete()
+        today = date.today()
+        for i in range(bookings):
+            rental = Rental.objects.create(
+                name=f'Query check rental {i}', category='Tools', details='x' * 500,
+                price=10, image='rentals/doge.jpg',
+            )
+            # Alternate past and upcoming so both active and history fill up
+            start = today + timedelta(days=10 if i % 2 else -10)
+            Booking.objects.create(
+                user=user, rental=rental, start_date=start, end_date=start + timedelta(days=2),
+                total_price=30, payment_status='Completed',
+            )
+
+        factory = APIRequestFactory()
+        detail_pk = Booking.objects.filter(user=user).values_list('id', flat=True).first()
+        counts = {}
+        for name, (view_class, path) in ENDPOINTS.items():
+            view = view_class.as_view()
+            for query in ('', '?expand=rental'):
+                request = factory.get(path.format(pk=detail_pk) + query)
+                force_authenticate(request, user=user)
+                with CaptureQueriesContext(connection) as captured:
+                    response = view(request, pk=detail_pk) if name == 'detail' else view(request)
+                    response.render()
+                if response.status_code != 200:
+                    raise CommandError(f'{name}{query} returned {response.status_code}')
+                counts[(name, query)] = len(captured)
+        return counts
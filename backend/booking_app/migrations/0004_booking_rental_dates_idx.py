@@ -0,0 +1,20 @@
+# Generated by Django 5.2 on 2026-10-17 11:32
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking_app', '0003_booking_currency_alter_booking_payment_method'),
+        ('rentals_app', '0002_rename_available_rental_is_available'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['rental', 'end_date', 'start_date'], name='booking_rental_dates_idx'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2 on 2026-10-17 12:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking_app', '0004_booking_rental_dates_idx'),
+        ('rentals_app', '0007_rental_external_id'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['start_date'], name='booking_start_date_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+"""
+Shared querysets for the booking endpoints.
+
+Every booking list and detail view goes through booking_queryset() so the
+rental is joined in the same query (select_related) and, unless the client
+asked for ?expand=rental, only the rental columns the slim representation
+needs are read.
+"""
+from .models import Booking
+
+# Rental columns used by BookingRentalSerializer
+SLIM_RENTAL_FIELDS = ('id', 'name', 'price', 'image')
+
+
+def wants_expanded_rental(request):
+    """True when the request asks for the full rental, e.g. ?expand=rental."""
+    if request is None:
+        return False
+    expand = request.query_params.get('expand', '')
+    return 'rental' in (part.strip() for part in expand.split(','))
+
+
+def booking_queryset(request, **filters):
+    """The requesting user's bookings matching `filters`, rental included."""
+    queryset = Booking.objects.filter(user=request.user, **filters).select_related('rental')
+    if not wants_expanded_rental(request):
+        booking_fields = [field.name for field in Booking._meta.concrete_fields]
+        queryset = queryset.only(*booking_fields, *(f'rental__{name}' for name in SLIM_RENTAL_FIELDS))
+    return queryset
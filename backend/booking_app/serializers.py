@@ -1,11 +1,28 @@
 from rest_framework import serializers
 from .models import Booking
+from .queries import SLIM_RENTAL_FIELDS, wants_expanded_rental
+from rentals_app.models import Rental
 from rentals_app.serializers import RentalSerializer  # Import RentalSerializer
 
+
+class BookingRentalSerializer(serializers.ModelSerializer):
+    """The rental as embedded in a booking: enough to render a booking card."""
+
+    class Meta:
+        model = Rental
+        fields = SLIM_RENTAL_FIELDS
+
+
 class BookingSerializer(serializers.ModelSerializer):
-    user = serializers.ReadOnlyField(source='user.id')  # Make user field read-only
-    rental = RentalSerializer(read_only=True)  # Include rental details
+    user = serializers.ReadOnlyField(source='user_id')  # Read-only, and no user lookup per booking
+    rental = BookingRentalSerializer(read_only=True)  # Slim rental; ?expand=rental gives the full one
 
     class Meta:
         model = Booking
         fields = '__all__'
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if wants_expanded_rental(self.context.get('request')):
+            fields['rental'] = RentalSerializer(read_only=True)
+        return fields
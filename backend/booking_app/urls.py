@@ -4,6 +4,7 @@ from .views import (
     BookingDetailView, 
     ActiveBookingsView, 
     RentalHistoryView, 
+    BookingExportView,
     CancelBookingView,
     CompleteBookingView
 )
@@ -13,6 +14,7 @@ urlpatterns = [
     path('<int:pk>/', BookingDetailView.as_view(), name='booking-detail'),  # Retrieve, update, and delete bookings
     path('active/', ActiveBookingsView.as_view(), name='active-bookings'),  # List active bookings
     path('history/', RentalHistoryView.as_view(), name='rental-history'),  # List rental history
+    path('export/', BookingExportView.as_view(), name='booking-export'),  # Stream bookings as CSV/JSONL
     path('cancel/', CancelBookingView.as_view(), name='cancel-booking'),  # Cancel booking
     path('complete/', CompleteBookingView.as_view(), name='complete-booking'),  # Complete booking and return rental to inventory
 ]
@@ -3,17 +3,23 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.exceptions import APIException
 from rest_framework.views import APIView
-from django.core.mail import send_mail
+from django.db import transaction
 from django.utils.timezone import now
 from django.core.exceptions import ValidationError
 from datetime import datetime, timedelta, date
 from decimal import Decimal
+import logging
 import uuid
 
 from .models import Booking
+from .availability import is_rental_free
+from .export import ExportError, export_response, filter_bookings
+from .queries import booking_queryset
 from .serializers import BookingSerializer
 from rentals_app.models import Rental
-from notifications_app.models import Notification  # Import Notification model
+from notifications_app.dispatch import notify, send_email
+
+logger = logging.getLogger(__name__)
 
 class BookingError(APIException):
     status_code = 400
@@ -26,7 +32,7 @@ class BookingListCreateView(generics.ListCreateAPIView):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return Booking.objects.filter(user=self.request.user).select_related('rental')
+        return booking_queryset(self.request).order_by('-created_at')
 
     def validate_booking_dates(self, start_date, end_date):
         if start_date > end_date:
@@ -37,46 +43,31 @@ class BookingListCreateView(generics.ListCreateAPIView):
     def perform_create(self, serializer):
         # Save the booking instance
         booking = serializer.save(user=self.request.user)
-        print(f"Booking created: {booking}")  # Debugging log
+        logger.debug("Booking %s created", booking.id)
 
-        # Create a notification for the user
+        # Queue a notification for the user
         try:
-            from notifications_app.models import Notification
-            
-            Notification.objects.create(
-                user=booking.user,
+            notify(
+                booking.user,
                 message=f"Your booking for {booking.rental.name} from {booking.start_date} to {booking.end_date} has been confirmed. Total price: ${booking.total_price}.",
                 data={
                     "booking_id": booking.id,
                     "rental_id": booking.rental.id,
                     "start_date": str(booking.start_date),
                     "end_date": str(booking.end_date),
-                    "total_price": booking.total_price,
+                    "total_price": float(booking.total_price),
                 },
             )
-            print("Notification created successfully.")  # Debugging log
-        except Exception as e:
-            print(f"Error creating notification: {str(e)}")  # Debugging log
+        except Exception:
+            logger.exception("Failed to queue the confirmation for booking %s", booking.id)
 
     def create(self, request, *args, **kwargs):
         try:
-            print("Incoming request data:", request.data)
-
             required_fields = ['rental', 'start_date', 'end_date', 'total_price', 'payment_method']
             missing_fields = [field for field in required_fields if field not in request.data]
             if missing_fields:
                 raise BookingError(f"Missing required fields: {', '.join(missing_fields)}")
 
-            try:
-                rental = Rental.objects.get(id=request.data['rental'])
-                
-                # Check if rental is already unavailable
-                if not rental.is_available:
-                    raise BookingError(f"The rental '{rental.name}' is not available for booking.")
-                    
-            except Rental.DoesNotExist:
-                raise BookingError(f"Rental with ID {request.data['rental']} does not exist.")
-
             try:
                 start_date = datetime.strptime(request.data['start_date'], '%Y-%m-%d').date()
                 end_date = datetime.strptime(request.data['end_date'], '%Y-%m-%d').date()
@@ -94,34 +85,42 @@ class BookingListCreateView(generics.ListCreateAPIView):
             if request.data['payment_method'] not in ['Online', 'Physical']:
                 raise BookingError('Invalid payment method. Use "Online" or "Physical"')
 
-            # Pass the rental instance to the serializer
             serializer = self.get_serializer(data=request.data)
             if not serializer.is_valid():
-                print("Serializer validation errors:", serializer.errors)
+                logger.info("Booking rejected by validation", extra={'errors': serializer.errors})
                 return Response({'error': serializer.errors, 'details': 'Validation failed'}, status=status.HTTP_400_BAD_REQUEST)
 
-            # Save booking and get the instance
-            booking = serializer.save(user=request.user, rental=rental)
+            # The availability check and the insert must be one unit: lock the
+            # rental row so concurrent requests for the same rental queue up
+            # here, and re-check overlaps only once the lock is held.
+            with transaction.atomic():
+                try:
+                    rental = Rental.objects.select_for_update().get(id=request.data['rental'])
+                except (Rental.DoesNotExist, ValueError):
+                    raise BookingError(f"Rental with ID {request.data['rental']} does not exist.")
 
-            # Mark the rental as unavailable
-            rental.is_available = False
-            rental.save()
-            print(f"Rental {rental.id} marked as unavailable")
+                # is_available is the listing switch admins toggle; date
+                # conflicts are checked separately
+                if not rental.is_available:
+                    raise BookingError(f"The rental '{rental.name}' is not available for booking.")
 
-            # Create notification explicitly
-            print(f"Creating notification for booking {booking.id}")
-            notification = Notification.objects.create(
-                user=booking.user,
-                message=f"Your booking for {booking.rental.name} from {booking.start_date} to {booking.end_date} has been confirmed. Total price: ${booking.total_price}.",
-                data={
-                    "booking_id": booking.id,
-                    "rental_id": booking.rental.id,
-                    "start_date": str(booking.start_date),
-                    "end_date": str(booking.end_date),
-                    "total_price": float(booking.total_price),  # Convert Decimal to float for JSON serialization
-                },
-            )
-            print(f"Notification created: {notification}")
+                if not is_rental_free(rental.id, start_date, end_date):
+                    raise BookingError(f"The rental '{rental.name}' is not available for the selected dates.")
+
+                booking = serializer.save(user=request.user, rental=rental)
+
+                # Queued now, written by the dispatcher once this commits
+                notify(
+                    booking.user,
+                    message=f"Your booking for {booking.rental.name} from {booking.start_date} to {booking.end_date} has been confirmed. Total price: ${booking.total_price}.",
+                    data={
+                        "booking_id": booking.id,
+                        "rental_id": booking.rental.id,
+                        "start_date": str(booking.start_date),
+                        "end_date": str(booking.end_date),
+                        "total_price": float(booking.total_price),  # Convert Decimal to float for JSON serialization
+                    },
+                )
 
             booking_data = serializer.data
 
@@ -144,12 +143,11 @@ class BookingListCreateView(generics.ListCreateAPIView):
                             'logo': 'https://your-logo-url.com/logo.png',
                         }
                     }
-                    print("Generated payment data:", payment_data)
+                    logger.info("Online payment requested for booking %s", booking_data['id'],
+                                extra={'tx_ref': payment_data['tx_ref']})
                     return Response(payment_data, status=status.HTTP_201_CREATED)
                 except Exception as e:
-                    # If payment setup fails, make rental available again
-                    rental.is_available = True
-                    rental.save()
+                    # If payment setup fails, release the booked dates again
                     Booking.objects.filter(id=booking_data['id']).delete()
                     raise BookingError(f'Payment setup failed: {str(e)}')
 
@@ -158,7 +156,7 @@ class BookingListCreateView(generics.ListCreateAPIView):
         except BookingError as e:
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
-            print(f"Unexpected error: {str(e)}")
+            logger.exception("Unexpected error creating a booking")
             return Response({'error': 'An unexpected error occurred', 'details': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 class BookingDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -167,7 +165,7 @@ class BookingDetailView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return Booking.objects.filter(user=self.request.user)
+        return booking_queryset(self.request)
 
     def update(self, request, *args, **kwargs):
         try:
@@ -179,26 +177,33 @@ class BookingDetailView(generics.RetrieveUpdateDestroyAPIView):
                 return Response({'error': 'End date cannot be before start date.'}, status=status.HTTP_400_BAD_REQUEST)
             if start_date < date.today():
                 return Response({'error': 'Start date cannot be in the past.'}, status=status.HTTP_400_BAD_REQUEST)
-
-            daily_price = booking.rental.price
-            new_total_price = Decimal((end_date - start_date).days + 1) * daily_price
-
-            if new_total_price > booking.total_price:
-                additional_payment = new_total_price - booking.total_price
-                booking.payment_status = 'Pending Additional Payment'
-                booking.total_price = new_total_price
-                booking.save()
-
-                return Response({
-                    'message': 'Booking updated. Additional payment required.',
-                    'additional_payment': float(additional_payment),
-                    'new_total_price': float(new_total_price),
-                }, status=status.HTTP_200_OK)
-
-            serializer = self.get_serializer(booking, data=request.data, partial=True)
-            serializer.is_valid(raise_exception=True)
-            self.perform_update(serializer)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            # Lock the rental like create() does, so the overlap check and the
+            # write happen before any other booking for it is checked
+            with transaction.atomic():
+                rental = Rental.objects.select_for_update().get(id=booking.rental_id)
+                booking.refresh_from_db()
+                if not is_rental_free(booking.rental_id, start_date, end_date, exclude_booking_id=booking.id):
+                    return Response({'error': 'The rental is not available for the selected dates.'}, status=status.HTTP_400_BAD_REQUEST)
+
+                daily_price = rental.price
+                new_total_price = Decimal((end_date - start_date).days + 1) * daily_price
+
+                if new_total_price > booking.total_price:
+                    additional_payment = new_total_price - booking.total_price
+                    booking.payment_status = 'Pending Additional Payment'
+                    booking.total_price = new_total_price
+                    booking.save()
+
+                    return Response({
+                        'message': 'Booking updated. Additional payment required.',
+                        'additional_payment': float(additional_payment),
+                        'new_total_price': float(new_total_price),
+                    }, status=status.HTTP_200_OK)
+
+                serializer = self.get_serializer(booking, data=request.data, partial=True)
+                serializer.is_valid(raise_exception=True)
+                self.perform_update(serializer)
+                return Response(serializer.data, status=status.HTTP_200_OK)
 
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
@@ -209,9 +214,9 @@ class ActiveBookingsView(generics.ListAPIView):
 
     def get_queryset(self):
         try:
-            return Booking.objects.filter(user=self.request.user, end_date__gte=date.today()).order_by('start_date')
-        except Exception as e:
-            print(f"Error fetching active bookings: {str(e)}")
+            return booking_queryset(self.request, end_date__gte=date.today()).order_by('start_date')
+        except Exception:
+            logger.exception("Error fetching active bookings")
             raise APIException("Failed to fetch active bookings. Please try again later.")
 
 class RentalHistoryView(generics.ListAPIView):
@@ -220,9 +225,9 @@ class RentalHistoryView(generics.ListAPIView):
 
     def get_queryset(self):
         try:
-            return Booking.objects.filter(user=self.request.user, end_date__lt=date.today()).order_by('-end_date')
-        except Exception as e:
-            print(f"Error fetching rental history: {str(e)}")
+            return booking_queryset(self.request, end_date__lt=date.today()).order_by('-end_date')
+        except Exception:
+            logger.exception("Error fetching rental history")
             raise APIException("Failed to fetch rental history. Please try again later.")
 
 class ConfirmPaymentView(APIView):
@@ -245,12 +250,12 @@ class ConfirmPaymentView(APIView):
             booking.payment_status = 'Completed'
             booking.save()
 
-            send_mail(
+            # Delivered off the request path; SMTP latency no longer blocks the worker
+            send_email(
                 subject='Booking Confirmation',
                 message=f'Your booking #{booking.id} has been confirmed. Thank you for your payment!',
                 from_email='noreply@rentify.com',
                 recipient_list=[request.user.email],
-                fail_silently=False,
             )
 
             return Response({'message': 'Payment confirmed and booking completed.'}, status=status.HTTP_200_OK)
@@ -258,7 +263,7 @@ class ConfirmPaymentView(APIView):
         except BookingError as e:
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
-            print(f"Unexpected error: {str(e)}")
+            logger.exception("Unexpected error confirming a payment")
             return Response({'error': 'An unexpected error occurred', 'details': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 class PaymentHistoryView(generics.ListAPIView):
@@ -266,7 +271,29 @@ class PaymentHistoryView(generics.ListAPIView):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return Booking.objects.filter(user=self.request.user, payment_status='Completed').order_by('-created_at')
+        return booking_queryset(self.request, payment_status='Completed').order_by('-created_at')
+
+class BookingExportView(APIView):
+    """
+    Stream bookings as CSV (default) or JSONL: ?output=jsonl. Filters:
+    from, to (start date range) and payment_status, e.g.
+    ?from=2025-05-01&to=2025-05-31&payment_status=Completed for a month of
+    payments. Staff export everyone's bookings (optionally ?user=<id>),
+    other users their own.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        queryset = Booking.objects.all()
+        if not request.user.is_staff:
+            queryset = queryset.filter(user_id=request.user.pk)
+        elif request.query_params.get('user', '').isdigit():
+            queryset = queryset.filter(user_id=int(request.query_params['user']))
+        try:
+            queryset = filter_bookings(queryset, request.query_params)
+            return export_response(request, queryset, request.query_params.get('output', 'csv'))
+        except ExportError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
 class CancelBookingView(APIView):
     permission_classes = [IsAuthenticated]
@@ -288,17 +315,12 @@ class CancelBookingView(APIView):
             # Store rental reference before deleting the booking
             rental = booking.rental
             
-            # Delete the booking
+            # Deleting the booking frees its dates for other renters
             booking.delete()
             
-            # Make rental available again
-            rental.is_available = True
-            rental.save()
-            print(f"Rental {rental.id} marked as available after cancellation")
-            
-            # Create notification for cancellation
-            Notification.objects.create(
-                user=request.user,
+            # Queue notification for cancellation
+            notify(
+                request.user,
                 message=f"Your booking for {rental.name} has been successfully canceled.",
                 data={
                     "rental_id": rental.id,
@@ -335,15 +357,11 @@ class CompleteBookingView(APIView):
             booking.payment_status = 'Completed'
             booking.save()
             
-            # Make rental available again
             rental = booking.rental
-            rental.is_available = True
-            rental.save()
-            print(f"Rental {rental.id} marked as available after completion")
             
-            # Create notification
-            Notification.objects.create(
-                user=booking.user,
+            # Queue notification
+            notify(
+                booking.user,
                 message=f"Your booking for {rental.name} has been completed. Thank you for using our service!",
                 data={
                     "booking_id": booking.id,
@@ -358,5 +376,5 @@ class CompleteBookingView(APIView):
             }, status=status.HTTP_200_OK)
             
         except Exception as e:
-            print(f"Error completing booking: {e}")
+            logger.exception("Error completing booking")
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
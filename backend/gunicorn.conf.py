@@ -0,0 +1,74 @@
+"""
+Gunicorn settings for production: `gunicorn -c gunicorn.conf.py` (as in the
+Procfile and Dockerfile). The application comes from `wsgi_app` below, so do
+not name one on the command line; it would override the ASGI switch.
+
+Two worker models, chosen with GUNICORN_WORKER_CLASS:
+
+- gthread (default): a few processes, each with a thread pool. Django and
+  the database driver release the GIL while waiting on I/O, so threads
+  overlap the query/network waits that dominate this API.
+- uvicorn: runs backend.asgi instead, one event loop per process. Use it
+  when the notification event stream (/api/notifications/stream/) is
+  enabled, since each open stream would otherwise hold a thread.
+
+Every value can be overridden from the environment for a given host.
+"""
+import multiprocessing
+import os
+
+cpu_count = multiprocessing.cpu_count()
+
+bind = os.getenv('GUNICORN_BIND', f"0.0.0.0:{os.getenv('PORT', '8000')}")
+
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+if worker_class == 'uvicorn':
+    worker_class = 'uvicorn.workers.UvicornWorker'
+    wsgi_app = 'backend.asgi:application'
+    # The event loop multiplexes connections; one process per core is enough
+    workers = int(os.getenv('WEB_CONCURRENCY', cpu_count))
+    threads = 1
+else:
+    wsgi_app = 'backend.wsgi:application'
+    # Fewer processes than the classic 2 * cores + 1 because each one also
+    # runs `threads` requests at a time
+    workers = int(os.getenv('WEB_CONCURRENCY', max(2, cpu_count + 1)))
+    # Also sizes the password hashing queue: AUTH_HASH_QUEUE defaults to
+    # threads - AUTH_HASH_WORKERS - 1 so a login burst leaves a thread free
+    # (backend/settings.py). Set it explicitly if you raise threads elsewhere.
+    threads = int(os.getenv('GUNICORN_THREADS', 4))
+
+# Import Django once in the master and fork the workers from it: faster
+# boots and shared copy-on-write memory. Background pools (notification
+# dispatch, thumbnails) and database connections are created lazily, so
+# nothing that cannot survive a fork exists yet.
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() in ('true', '1', 'yes')
+
+# Recycle workers periodically so slow leaks cannot accumulate; the jitter
+# keeps them from all restarting at the same moment
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+# Long enough for a browser to reuse the connection for its next API call,
+# short enough that idle connections do not tie up worker threads
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+
+# Heartbeat files on tmpfs: a slow disk must not make workers look dead
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+# Behind a proxy that terminates TLS
+forwarded_allow_ips = os.getenv('FORWARDED_ALLOW_IPS', '127.0.0.1')
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG') or None  # '-' for stdout
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+
+def post_fork(server, worker):
+    # Connections opened in the master while preloading must not be shared
+    from django.db import connections
+
+    connections.close_all()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+"""
+Stdlib load generator for the main API endpoints.
+
+Start the server with the profile under test, e.g.
+
+    gunicorn -c gunicorn.conf.py
+    GUNICORN_WORKER_CLASS=uvicorn gunicorn -c gunicorn.conf.py
+
+then, from another shell:
+
+    python loadtest.py --url http://127.0.0.1:8000 --server-workers 4 --duration 30
+
+Each client thread keeps one HTTP/1.1 connection open and cycles through the
+scenario. The report lists requests per second overall and per server
+worker, plus latency percentiles, for every endpoint; --output saves it as
+JSON so runs with different worker settings can be compared.
+"""
+import argparse
+import http.client
+import json
+import statistics
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from urllib.parse import urlsplit
+
+
+def scenario(rental_id):
+    start = date.today() + timedelta(days=30)
+    end = start + timedelta(days=3)
+    endpoints = [
+        ('health', '/api/health/', False),
+        ('rentals', '/api/rentals/', False),
+        ('rentals-search', '/api/rentals/?search=car&ordering=-rating', False),
+        ('rentals-available', f'/api/rentals/available/?start={start}&end={end}', False),
+        ('unread-count', '/api/notifications/unread-count/', True),
+        ('bookings-active', '/api/bookings/active/', True),
+    ]
+    if rental_id:
+        endpoints.insert(2, ('rental-detail', f'/api/rentals/{rental_id}/', False))
+    return endpoints
+
+
+class Client(threading.Thread):
+    def __init__(self, target, endpoints, token, deadline, results, lock):
+        super().__init__(daemon=True)
+        self.target = target
+        self.endpoints = endpoints
+        self.token = token
+        self.deadline = deadline
+        self.results = results
+        self.lock = lock
+
+    def connect(self):
+        connection_class = http.client.HTTPSConnection if self.target.scheme == 'https' else http.client.HTTPConnection
+        return connection_class(self.target.hostname, self.target.port, timeout=30)
+
+    def run(self):
+        connection = self.connect()
+        local = defaultdict(lambda: {'latencies': [], 'errors': 0})
+        i = 0
+        while time.monotonic() < self.deadline:
+            name, path, needs_auth = self.endpoints[i % len(self.endpoints)]
+            i += 1
+            headers = {'Accept-Encoding': 'gzip'}
+            if needs_auth:
+                headers['Authorization'] = f'Bearer {self.token}'
+            started = time.perf_counter()
+            ok = False
+            for attempt in range(2):
+                try:
+                    connection.request('GET', path, headers=headers)
+                    response = connection.getresponse()
+                    response.read()
+                    ok = response.status < 400
+                    break
+                except (OSError, http.client.HTTPException):
+                    # The server may close an idle keep-alive connection (or a
+                    # recycled worker drops it); reconnect and retry once
+                    connection.close()
+                    connection = self.connect()
+            elapsed = (time.perf_counter() - started) * 1000
+            if ok:
+                local[name]['latencies'].append(elapsed)
+            else:
+                local[name]['errors'] += 1
+        connection.close()
+        with self.lock:
+            for name, data in local.items():
+                self.results[name]['latencies'].extend(data['latencies'])
+                self.results[name]['errors'] += data['errors']
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--duration', type=float, default=30, help="Seconds to run.")
+    parser.add_argument('--concurrency', type=int, default=32, help="Client threads.")
+    parser.add_argument('--server-workers', type=int, default=1,
+                        help="Worker processes the server runs, to report requests/s per worker.")
+    parser.add_argument('--token', help="JWT access token; authenticated endpoints are skipped without it.")
+    parser.add_argument('--rental', type=int, help="Rental id for the detail endpoint.")
+    parser.add_argument('--output', help="Write the report as JSON to this file.")
+    args = parser.parse_args()
+
+    target = urlsplit(args.url)
+    endpoints = [e for e in scenario(args.rental) if args.token or not e[2]]
+    results = defaultdict(lambda: {'latencies': [], 'errors': 0})
+    lock = threading.Lock()
+    deadline = time.monotonic() + args.duration
+
+    clients = [Client(target, endpoints, args.token, deadline, results, lock) for _ in range(args.concurrency)]
+    started = time.monotonic()
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+    wall = time.monotonic() - started
+
+    report = {
+        'url': args.url,
+        'duration': round(wall, 2),
+        'concurrency': args.concurrency,
+        'server_workers': args.server_workers,
+        'endpoints': {},
+    }
+    print(f"{'endpoint':<20}{'requests':>10}{'errors':>8}{'req/s':>10}{'req/s/worker':>14}"
+          f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    total = 0
+    for name, _, _ in endpoints:
+        data = results[name]
+        count = len(data['latencies'])
+        total += count
+        rps = count / wall
+        row = {
+            'requests': count,
+            'errors': data['errors'],
+            'rps': round(rps, 1),
+            'rps_per_worker': round(rps / args.server_workers, 1),
+            'p50_ms': round(statistics.median(data['latencies']), 2) if count else 0.0,
+            'p95_ms': round(percentile(data['latencies'], 0.95), 2),
+            'p99_ms': round(percentile(data['latencies'], 0.99), 2),
+        }
+        report['endpoints'][name] = row
+        print(f"{name:<20}{count:>10}{row['errors']:>8}{row['rps']:>10}{row['rps_per_worker']:>14}"
+              f"{row['p50_ms']:>9}{row['p95_ms']:>9}{row['p99_ms']:>9}")
+    report['total_rps'] = round(total / wall, 1)
+    report['total_rps_per_worker'] = round(total / wall / args.server_workers, 1)
+    print(f"total: {report['total_rps']} req/s, {report['total_rps_per_worker']} req/s per worker")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    errors = sum(data['errors'] for data in results.values())
+    return 1 if errors and not total else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,8 +1,13 @@
 from django.contrib import admin
-from .models import Notification
+from .models import Notification, OutboxMessage
 
 @admin.register(Notification)
 class NotificationAdmin(admin.ModelAdmin):
     list_display = ('user', 'message', 'is_read', 'created_at')
     list_filter = ('is_read', 'created_at')
-    search_fields = ('user__username', 'message')
\ No newline at end of file
+    search_fields = ('user__username', 'message')
+
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'attempts', 'created_at', 'processed_at')
+    list_filter = ('kind', 'processed_at')
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class NotificationsAppConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'notifications_app'
+
+    def ready(self):
+        # Connect the unread-counter and push-publishing signal receivers
+        from . import counters, stream  # noqa: F401
@@ -0,0 +1,115 @@
+"""
+Publish/subscribe channel used to push new notifications to connected clients.
+
+InProcessBroker only reaches subscribers in the same process, which is what
+a single ASGI server needs. A shared broker (e.g. one backed by Redis
+pub/sub) can be dropped in by implementing BaseBroker and pointing the
+NOTIFICATION_BROKER setting at it.
+"""
+import asyncio
+import queue
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class Subscription:
+    """
+    Buffered mailbox for one subscriber. Sync subscribers block on get();
+    async subscribers await aget() and are woken on their own event loop,
+    so publishing from a worker thread is safe for both.
+    """
+
+    def __init__(self, broker, channel, loop=None):
+        self.broker = broker
+        self.channel = channel
+        self.loop = loop
+        self.queue = asyncio.Queue() if loop else queue.Queue()
+
+    def put(self, message):
+        if self.loop:
+            self.loop.call_soon_threadsafe(self.queue.put_nowait, message)
+        else:
+            self.queue.put(message)
+
+    def get(self, timeout=None):
+        """Next message, or None once `timeout` seconds pass without one."""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    async def aget(self, timeout=None):
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class BaseBroker:
+    def publish(self, channel, message):
+        raise NotImplementedError
+
+    def subscribe(self, channel):
+        """Subscribe from synchronous code (e.g. a long-poll request)."""
+        raise NotImplementedError
+
+    def asubscribe(self, channel):
+        """Subscribe from a coroutine running on the current event loop."""
+        raise NotImplementedError
+
+    def unsubscribe(self, subscription):
+        raise NotImplementedError
+
+
+class InProcessBroker(BaseBroker):
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscribers = defaultdict(set)
+
+    def publish(self, channel, message):
+        with self.lock:
+            subscribers = list(self.subscribers.get(channel, ()))
+        for subscription in subscribers:
+            subscription.put(message)
+
+    def _add(self, subscription):
+        with self.lock:
+            self.subscribers[subscription.channel].add(subscription)
+        return subscription
+
+    def subscribe(self, channel):
+        return self._add(Subscription(self, channel))
+
+    def asubscribe(self, channel):
+        return self._add(Subscription(self, channel, loop=asyncio.get_running_loop()))
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            subscribers = self.subscribers.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self.subscribers[subscription.channel]
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = import_string(settings.NOTIFICATION_BROKER)()
+    return _broker
+
+
+def user_channel(user_id):
+    return f'notifications:user:{user_id}'
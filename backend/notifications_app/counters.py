@@ -0,0 +1,68 @@
+"""
+Per-user unread notification counters kept in the cache.
+
+Counts are adjusted incrementally as notifications are created and read.
+A missing key is rebuilt lazily from one COUNT query on the partial unread
+index, so the cache can be flushed at any time without losing correctness.
+"""
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Notification
+from .signals import notifications_created
+
+
+def _key(user_id):
+    return f'notifications:unread:{user_id}'
+
+
+def get_unread_count(user_id):
+    count = cache.get(_key(user_id))
+    if count is None:
+        count = Notification.objects.filter(user_id=user_id, is_read=False).count()
+        # add() rather than set(): never clobber a value a concurrent writer
+        # has already adjusted since our COUNT ran
+        cache.add(_key(user_id), count, settings.NOTIFICATION_UNREAD_TTL)
+    return count
+
+
+def adjust_unread_count(user_id, delta):
+    """Apply delta to a cached counter; a missing counter is left to be rebuilt."""
+    try:
+        if cache.incr(_key(user_id), delta) < 0:
+            cache.delete(_key(user_id))
+    except ValueError:
+        pass
+
+
+def set_unread_count(user_id, count):
+    cache.set(_key(user_id), count, settings.NOTIFICATION_UNREAD_TTL)
+
+
+def invalidate_unread_count(user_id):
+    cache.delete(_key(user_id))
+
+
+@receiver(notifications_created)
+def count_created_notifications(sender, notifications, **kwargs):
+    for user_id, created in Counter(n.user_id for n in notifications if not n.is_read).items():
+        adjust_unread_count(user_id, created)
+
+
+@receiver(post_save, sender=Notification)
+def count_saved_notification(sender, instance, created, **kwargs):
+    if created:
+        if not instance.is_read:
+            adjust_unread_count(instance.user_id, 1)
+    else:
+        # Arbitrary edits (e.g. from the admin) may flip is_read either way
+        invalidate_unread_count(instance.user_id)
+
+
+@receiver(post_delete, sender=Notification)
+def count_deleted_notification(sender, instance, **kwargs):
+    invalidate_unread_count(instance.user_id)
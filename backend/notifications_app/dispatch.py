@@ -0,0 +1,268 @@
+"""
+Background delivery of notifications and emails.
+
+Views call notify() and send_email() instead of writing Notification rows
+or talking to the mail server inline. The dispatcher named by the
+NOTIFICATION_DISPATCHER setting decides when the work actually happens:
+
+- ThreadPoolDispatcher (default) batches messages in process and writes
+  them from worker threads once the surrounding transaction commits.
+- OutboxDispatcher stores each message as an OutboxMessage row in the
+  caller's transaction; `manage.py run_notification_worker` delivers them.
+- ImmediateDispatcher delivers in the calling thread, for tests and shells.
+"""
+import atexit
+import logging
+import queue
+import threading
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import close_old_connections, transaction
+from django.utils.module_loading import import_string
+from django.utils.timezone import now
+
+from .models import Notification, OutboxMessage
+from .signals import notifications_created
+
+logger = logging.getLogger(__name__)
+
+
+def deliver(messages):
+    """
+    Deliver a batch of (kind, payload) pairs: notification rows go out in a
+    single bulk_create and emails share one mail connection. A failing
+    message does not take the rest of the batch with it. Returns
+    {index in `messages`: exception} for the messages that failed.
+    """
+    failures = {}
+    notifications = [
+        (index, Notification(user_id=payload['user_id'], message=payload['message'], data=payload.get('data')))
+        for index, (kind, payload) in enumerate(messages)
+        if kind == OutboxMessage.KIND_NOTIFICATION
+    ]
+    emails = [
+        (index, EmailMessage(
+            subject=payload['subject'],
+            body=payload['message'],
+            from_email=payload.get('from_email'),
+            to=payload['recipient_list'],
+        ))
+        for index, (kind, payload) in enumerate(messages)
+        if kind == OutboxMessage.KIND_EMAIL
+    ]
+
+    if notifications:
+        # Foreign keys are only checked at commit, which a savepoint inside
+        # the outbox worker's transaction would not reach; drop rows whose
+        # user has been deleted meanwhile up front
+        users = Notification._meta.get_field('user').related_model
+        user_ids = {notification.user_id for _, notification in notifications}
+        existing = set(users.objects.filter(pk__in=user_ids).values_list('pk', flat=True))
+        for index, notification in notifications:
+            if notification.user_id not in existing:
+                failures[index] = users.DoesNotExist(f"User {notification.user_id} does not exist")
+        notifications = [(index, notification) for index, notification in notifications if index not in failures]
+    if notifications:
+        try:
+            with transaction.atomic():
+                Notification.objects.bulk_create([notification for _, notification in notifications])
+            created = [notification for _, notification in notifications]
+        except Exception:
+            # One bad row (e.g. its user was deleted meanwhile) fails the
+            # whole INSERT; write the rows one at a time instead
+            created = []
+            for index, notification in notifications:
+                try:
+                    with transaction.atomic():
+                        Notification.objects.bulk_create([notification])
+                    created.append(notification)
+                except Exception as e:
+                    failures[index] = e
+        if created:
+            transaction.on_commit(
+                lambda: notifications_created.send(sender=Notification, notifications=created)
+            )
+    if emails:
+        connection = get_connection(fail_silently=False)
+        try:
+            connection.open()
+        except Exception as e:
+            failures.update((index, e) for index, _ in emails)
+        else:
+            # One message per call, so a rejected recipient fails only its own email
+            for index, email in emails:
+                try:
+                    connection.send_messages([email])
+                except Exception as e:
+                    failures[index] = e
+            try:
+                connection.close()
+            except Exception:
+                logger.warning("Could not close the mail connection", exc_info=True)
+    return failures
+
+
+def log_failures(messages, failures):
+    for index, error in failures.items():
+        kind, payload = messages[index]
+        logger.error("Failed to deliver %s message: %s", kind, error, exc_info=error)
+
+
+class BaseDispatcher:
+    def submit(self, kind, payload):
+        raise NotImplementedError
+
+
+class ImmediateDispatcher(BaseDispatcher):
+    def submit(self, kind, payload):
+        def run():
+            messages = [(kind, payload)]
+            log_failures(messages, deliver(messages))
+
+        transaction.on_commit(run)
+
+
+class ThreadPoolDispatcher(BaseDispatcher):
+    """
+    In-process queue drained by a small pool of daemon threads. Each thread
+    collects up to NOTIFICATION_BATCH_SIZE messages before writing them, so
+    a burst of bookings turns into a handful of bulk inserts. Messages that
+    fail are queued again after NOTIFICATION_RETRY_DELAY seconds (doubling
+    each time), up to NOTIFICATION_MAX_ATTEMPTS attempts in all.
+    """
+
+    def __init__(self):
+        self.batch_size = getattr(settings, 'NOTIFICATION_BATCH_SIZE', 100)
+        self.batch_wait = getattr(settings, 'NOTIFICATION_BATCH_WAIT', 0.05)
+        self.max_attempts = getattr(settings, 'NOTIFICATION_MAX_ATTEMPTS', 3)
+        self.retry_delay = getattr(settings, 'NOTIFICATION_RETRY_DELAY', 1.0)
+        self.queue = queue.Queue()
+        self.threads = [
+            threading.Thread(target=self.run, name=f'notification-dispatch-{i}', daemon=True)
+            for i in range(getattr(settings, 'NOTIFICATION_WORKERS', 2))
+        ]
+        for thread in self.threads:
+            thread.start()
+        atexit.register(self.flush)
+
+    def submit(self, kind, payload):
+        # Only hand the message over once the booking that triggered it is
+        # committed; a rolled-back request then produces no notification.
+        transaction.on_commit(lambda: self.queue.put((kind, payload, 1)))
+
+    def next_batch(self):
+        batch = [self.queue.get()]
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get(timeout=self.batch_wait))
+            except queue.Empty:
+                break
+        return batch
+
+    def run(self):
+        while True:
+            batch = self.next_batch()
+            messages = [(kind, payload) for kind, payload, _ in batch]
+            try:
+                close_old_connections()
+                failures = deliver(messages)
+            except Exception as e:
+                logger.exception("Failed to deliver %d queued notification(s)", len(batch))
+                failures = dict.fromkeys(range(len(batch)), e)
+            for index, item in enumerate(batch):
+                if index in failures and item[2] < self.max_attempts:
+                    logger.warning("Delivery attempt %d of a %s message failed, retrying: %s",
+                                   item[2], item[0], failures[index])
+                    self.retry(item)
+                else:
+                    if index in failures:
+                        log_failures(messages, {index: failures[index]})
+                    self.queue.task_done()
+
+    def retry(self, item):
+        kind, payload, attempt = item
+
+        def requeue():
+            self.queue.put((kind, payload, attempt + 1))
+            # Only now, so flush() also waits for pending retries
+            self.queue.task_done()
+
+        timer = threading.Timer(self.retry_delay * 2 ** (attempt - 1), requeue)
+        timer.daemon = True
+        timer.start()
+
+    def flush(self):
+        """Block until everything queued so far has been delivered."""
+        self.queue.join()
+
+
+class OutboxDispatcher(BaseDispatcher):
+    """Durable option: one OutboxMessage insert in the caller's transaction."""
+
+    def submit(self, kind, payload):
+        OutboxMessage.objects.create(kind=kind, payload=payload)
+
+    @staticmethod
+    def process_pending(batch_size=100, max_attempts=5):
+        """
+        Deliver one batch of pending outbox rows. Returns how many rows were
+        claimed. Called by the run_notification_worker command.
+        """
+        with transaction.atomic():
+            pending = list(
+                OutboxMessage.objects.select_for_update(skip_locked=True)
+                .filter(processed_at__isnull=True, attempts__lt=max_attempts)
+                .order_by('id')[:batch_size]
+            )
+            if not pending:
+                return 0
+            messages = [(message.kind, message.payload) for message in pending]
+            # deliver() writes each notification in a savepoint, so a failed
+            # message leaves no row behind to be inserted again on retry
+            failures = deliver(messages)
+            log_failures(messages, failures)
+            failed = []
+            for index, error in failures.items():
+                message = pending[index]
+                message.attempts += 1
+                message.last_error = str(error)
+                failed.append(message)
+            if failed:
+                OutboxMessage.objects.bulk_update(failed, ['attempts', 'last_error'])
+            delivered = [message.id for index, message in enumerate(pending) if index not in failures]
+            OutboxMessage.objects.filter(id__in=delivered).update(processed_at=now())
+        return len(pending)
+
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher():
+    global _dispatcher
+    if _dispatcher is None:
+        with _dispatcher_lock:
+            if _dispatcher is None:
+                _dispatcher = import_string(settings.NOTIFICATION_DISPATCHER)()
+    return _dispatcher
+
+
+def notify(user, message, data=None):
+    """Queue an in-app notification for `user` (a User or a user id)."""
+    user_id = getattr(user, 'pk', user)
+    get_dispatcher().submit(OutboxMessage.KIND_NOTIFICATION, {
+        'user_id': user_id,
+        'message': message,
+        'data': data,
+    })
+
+
+def send_email(subject, message, recipient_list, from_email=None):
+    """Queue an email; delivery errors are logged by the dispatcher, not raised here."""
+    get_dispatcher().submit(OutboxMessage.KIND_EMAIL, {
+        'subject': subject,
+        'message': message,
+        'from_email': from_email,
+        'recipient_list': list(recipient_list),
+    })
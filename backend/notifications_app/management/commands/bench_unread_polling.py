@@ -0,0 +1,66 @@
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from auth_app.models import User
+from backend.transactions import rolled_back
+from notifications_app.counters import _key
+from notifications_app.models import Notification
+from notifications_app.views import unread_notification_count
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare unread-count polling throughput: a COUNT(*) per poll (cache cleared '
+        'before every request), the cached counter, and the cached counter with '
+        'If-None-Match revalidation. Seed data is rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--notifications', type=int, default=50_000)
+        parser.add_argument('--unread-ratio', type=float, default=0.2)
+        parser.add_argument('--duration', type=float, default=3.0, help='Seconds per scenario.')
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            user = User.objects.create_user(username='bench-unread', password=None)
+            every = max(1, round(1 / options['unread_ratio'])) if options['unread_ratio'] else 0
+            Notification.objects.bulk_create(
+                (
+                    Notification(user=user, message=f'Bench notification {i}',
+                                 is_read=not (every and i % every == 0))
+                    for i in range(options['notifications'])
+                ),
+                batch_size=5000,
+            )
+            results = [
+                self.run('COUNT(*) per poll', user, options['duration'], clear_cache=True),
+                self.run('cached counter', user, options['duration']),
+                self.run('cached counter + ETag', user, options['duration'], revalidate=True),
+            ]
+            # The user is rolled back; drop its counter with it
+            cache.delete(_key(user.id))
+
+        baseline = results[0][1]
+        for name, qps in results:
+            self.stdout.write(f'{name:<24} {qps:>10.0f} polls/s  ({qps / baseline:.1f}x)')
+
+    def run(self, name, user, duration, clear_cache=False, revalidate=False):
+        factory = APIRequestFactory()
+        etag = None
+        polls = 0
+        deadline = time.perf_counter() + duration
+        started = time.perf_counter()
+        while time.perf_counter() < deadline:
+            if clear_cache:
+                cache.delete(_key(user.id))
+            headers = {'HTTP_IF_NONE_MATCH': etag} if revalidate and etag else {}
+            request = factory.get('/api/notifications/unread/', **headers)
+            force_authenticate(request, user=user)
+            response = unread_notification_count(request)
+            response.render()
+            etag = response.get('ETag')
+            polls += 1
+        return name, polls / (time.perf_counter() - started)
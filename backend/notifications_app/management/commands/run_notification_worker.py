@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from notifications_app.dispatch import OutboxDispatcher
+
+
+class Command(BaseCommand):
+    help = 'Deliver notifications and emails queued in the outbox (NOTIFICATION_DISPATCHER=OutboxDispatcher).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--interval', type=float, default=1.0,
+                            help='Seconds to sleep when the outbox is empty.')
+        parser.add_argument('--max-attempts', type=int, default=5)
+        parser.add_argument('--once', action='store_true',
+                            help='Drain the outbox once and exit instead of polling.')
+
+    def handle(self, *args, **options):
+        self.stdout.write('Notification worker started')
+        while True:
+            processed = OutboxDispatcher.process_pending(
+                batch_size=options['batch_size'],
+                max_attempts=options['max_attempts'],
+            )
+            if processed:
+                self.stdout.write(f'Processed {processed} outbox message(s)')
+                continue
+            if options['once']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,28 @@
+# Generated by Django 5.2 on 2026-10-17 11:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications_app', '0003_remove_notification_notificatio_is_read_51e701_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxMessage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('notification', 'Notification'), ('email', 'Email')], max_length=20)),
+                ('payload', models.JSONField()),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['processed_at', 'id'], name='outbox_pending_idx')],
+            },
+        ),
+    ]
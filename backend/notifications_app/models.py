@@ -12,10 +12,54 @@ class Notification(models.Model):
     is_read = models.BooleanField(default=False)  # Indicates whether the notification has been read
     created_at = models.DateTimeField(auto_now_add=True)  # Timestamp for when the notification was created
 
+    class Meta:
+        indexes = [
+            # Backs the keyset-paginated feed: WHERE user_id = ? AND created_at < ?
+            # ORDER BY created_at DESC, id DESC LIMIT n
+            models.Index(fields=['user', '-created_at', '-id'], name='notif_user_feed_idx'),
+            # Unread lookups only touch the (usually small) unread slice
+            models.Index(fields=['user'], condition=models.Q(is_read=False), name='notif_user_unread_idx'),
+        ]
+
     def mark_as_read(self):
-        """Mark the notification as read."""
+        """Mark the notification as read and keep the cached unread counter in step."""
+        from .counters import adjust_unread_count
+
+        # Conditional UPDATE: only the request that actually flips the row
+        # decrements the counter
+        updated = Notification.objects.filter(pk=self.pk, is_read=False).update(is_read=True)
         self.is_read = True
-        self.save()
+        if updated:
+            adjust_unread_count(self.user_id, -1)
 
     def __str__(self):
         return f"Notification for {self.user.username}: {self.message}"
+
+
+class OutboxMessage(models.Model):
+    """
+    Durable queue entry for notifications and emails written by
+    OutboxDispatcher and drained by `manage.py run_notification_worker`.
+    """
+    KIND_NOTIFICATION = 'notification'
+    KIND_EMAIL = 'email'
+    KIND_CHOICES = [
+        (KIND_NOTIFICATION, 'Notification'),
+        (KIND_EMAIL, 'Email'),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    payload = models.JSONField()
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # The worker only ever scans pending rows in insertion order
+            models.Index(fields=['processed_at', 'id'], name='outbox_pending_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.id}"
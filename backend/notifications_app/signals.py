@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+# Sent after a batch of Notification rows has been inserted with bulk_create,
+# which skips post_save. Receivers get `notifications`, the saved instances.
+notifications_created = Signal()
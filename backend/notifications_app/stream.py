@@ -0,0 +1,234 @@
+"""
+Push delivery of new notifications.
+
+- POST /api/notifications/stream/ticket/  Short-lived, single-use ticket
+  for opening the stream. EventSource cannot send headers, and the access
+  token must not end up in URLs and access logs.
+- GET /api/notifications/stream/?ticket=  Server-Sent Events; needs the
+  ASGI entry point (backend/asgi.py) so an idle connection does not pin a
+  worker.
+- GET /api/notifications/poll/    Long-poll fallback. Under WSGI a waiting
+  poll would pin one of the few worker threads, so it answers straight away
+  and tells the client to poll again after NOTIFICATION_POLL_INTERVAL.
+
+New rows are published to the user's broker channel once they are
+committed, whichever way they were created. A publish only wakes waiting
+clients, which then read the table. The in-process broker does not hear
+rows created by other worker processes, so waiting clients also re-read the
+table every NOTIFICATION_RECHECK_INTERVAL seconds (one indexed query per
+connection per interval).
+"""
+import asyncio
+import json
+import secrets
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from .broker import get_broker, user_channel
+from .models import Notification
+from .serializers import NotificationSerializer
+from .signals import notifications_created
+
+BACKLOG_LIMIT = 50
+TICKET_SALT = 'notifications.stream-ticket'
+
+
+def publish_notifications(notifications):
+    broker = get_broker()
+    for notification in notifications:
+        broker.publish(user_channel(notification.user_id), NotificationSerializer(notification).data)
+
+
+@receiver(notifications_created)
+def publish_created_notifications(sender, notifications, **kwargs):
+    publish_notifications(notifications)
+
+
+@receiver(post_save, sender=Notification)
+def publish_saved_notification(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(lambda: publish_notifications([instance]))
+
+
+def missed_notifications(user_id, after_id):
+    queryset = Notification.objects.filter(user_id=user_id, id__gt=after_id).only(
+        'id', 'message', 'is_read', 'created_at'
+    ).order_by('id')[:BACKLOG_LIMIT]
+    return [NotificationSerializer(n).data for n in queryset]
+
+
+def latest_notification_id(user_id):
+    return Notification.objects.filter(user_id=user_id).order_by('-id').values_list('id', flat=True).first() or 0
+
+
+async def wait_for_notifications(subscription, user_id, after, timeout):
+    """
+    Notifications newer than `after`, waiting up to `timeout` seconds for
+    one to appear. Returns an empty list if none did.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while True:
+        results = await sync_to_async(missed_notifications)(user_id, after)
+        remaining = deadline - loop.time()
+        if results or remaining <= 0:
+            return results
+        # Woken early by a publish from this process; otherwise re-read the
+        # table after the interval in case another process created one
+        await subscription.aget(timeout=min(remaining, settings.NOTIFICATION_RECHECK_INTERVAL))
+
+
+def stream_user_id(request):
+    """User id from the JWT access token in the Authorization header, without a database lookup."""
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = header and authentication.get_raw_token(header)
+    if not raw_token:
+        return None
+    try:
+        validated = authentication.get_validated_token(raw_token)
+    except (InvalidToken, TokenError):
+        return None
+    return validated.get(jwt_settings.USER_ID_CLAIM)
+
+
+def issue_stream_ticket(user_id):
+    # The nonce makes every ticket distinct, so each can be spent once
+    return signing.dumps({'user': user_id, 'nonce': secrets.token_urlsafe(12)}, salt=TICKET_SALT)
+
+
+async def redeem_stream_ticket(ticket):
+    """User id for a valid, unexpired ticket seen for the first time, else None."""
+    ttl = settings.NOTIFICATION_STREAM_TICKET_TTL
+    try:
+        payload = signing.loads(ticket, salt=TICKET_SALT, max_age=ttl)
+    except signing.BadSignature:
+        return None
+    # A ticket copied out of a URL or log has already been used (across
+    # processes only with a shared cache such as Redis)
+    if not await cache.aadd(f"notifications:stream-ticket:{payload['nonce']}", True, ttl):
+        return None
+    return payload['user']
+
+
+def unauthorized():
+    return JsonResponse({'detail': 'Authentication credentials were not provided or are invalid.'},
+                        status=status.HTTP_401_UNAUTHORIZED)
+
+
+def sse_event(notification):
+    return f"id: {notification['id']}\nevent: notification\ndata: {json.dumps(notification)}\n\n"
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def notification_stream_ticket(request):
+    """
+    POST: a ticket for GET /api/notifications/stream/?ticket=, valid once
+    within NOTIFICATION_STREAM_TICKET_TTL seconds. `streaming` is false when
+    the server runs under WSGI and the client should poll instead.
+    """
+    return Response({
+        'ticket': issue_stream_ticket(request.user.pk),
+        'expires_in': settings.NOTIFICATION_STREAM_TICKET_TTL,
+        'streaming': isinstance(request._request, ASGIRequest),
+    })
+
+
+async def notification_stream(request):
+    if not isinstance(request, ASGIRequest):
+        # A sync worker would have to buffer the endless stream; clients
+        # should fall back to the long-poll endpoint instead.
+        return JsonResponse(
+            {'detail': 'Streaming requires the ASGI server. Use /api/notifications/poll/ instead.'},
+            status=status.HTTP_501_NOT_IMPLEMENTED,
+        )
+
+    user_id = await redeem_stream_ticket(request.GET.get('ticket', ''))
+    if user_id is None:
+        return unauthorized()
+    last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('last_id')
+
+    async def events():
+        # Subscribe before reading the table so a publish in between still wakes us
+        subscription = get_broker().asubscribe(user_channel(user_id))
+        try:
+            if last_event_id and last_event_id.isdigit():
+                last_id = int(last_event_id)
+            else:
+                last_id = await sync_to_async(latest_notification_id)(user_id)
+            yield f'retry: {settings.NOTIFICATION_STREAM_RETRY_MS}\n\n'
+            while True:
+                notifications = await wait_for_notifications(
+                    subscription, user_id, last_id, settings.NOTIFICATION_STREAM_KEEPALIVE)
+                # Comment lines keep proxies from timing out an idle stream
+                if not notifications:
+                    yield ': keepalive\n\n'
+                for notification in notifications:
+                    yield sse_event(notification)
+                    last_id = notification['id']
+        finally:
+            subscription.close()
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@require_GET
+async def notification_long_poll(request):
+    """
+    GET ?after=<notification id>&timeout=<seconds>: returns notifications newer
+    than `after` straight away if there are any, otherwise waits up to
+    `timeout` seconds for one (ASGI only). `next_poll` is how many seconds the
+    client should wait before polling again. Takes the access token in the
+    Authorization header.
+    """
+    user_id = stream_user_id(request)
+    if user_id is None:
+        return unauthorized()
+    try:
+        after = request.GET.get('after')
+        after = int(after) if after is not None else None
+        timeout = min(float(request.GET.get('timeout', settings.NOTIFICATION_LONG_POLL_TIMEOUT)),
+                      settings.NOTIFICATION_LONG_POLL_TIMEOUT)
+    except ValueError:
+        return JsonResponse({'error': '`after` and `timeout` must be numbers.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    asgi = isinstance(request, ASGIRequest)
+    if not asgi:
+        # Waiting would hold a gthread worker for the whole timeout
+        timeout = 0
+
+    subscription = get_broker().asubscribe(user_channel(user_id))
+    try:
+        if after is None:
+            # First poll: start from the newest existing notification
+            after = await sync_to_async(latest_notification_id)(user_id)
+        results = await wait_for_notifications(subscription, user_id, after, timeout)
+    finally:
+        subscription.close()
+
+    last_id = max([after] + [n['id'] for n in results])
+    return JsonResponse({
+        'results': results,
+        'last_id': last_id,
+        'next_poll': 0 if asgi else settings.NOTIFICATION_POLL_INTERVAL,
+    })
@@ -2,30 +2,43 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.authentication import TokenAuthentication
-from rest_framework import status
+from rest_framework import generics, status
+from rest_framework.pagination import CursorPagination
 from .models import Notification
+from .counters import get_unread_count, set_unread_count
+from .serializers import NotificationSerializer
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 from rest_framework_simplejwt.tokens import AccessToken
+import logging
 
-class NotificationListView(APIView):
+logger = logging.getLogger(__name__)
+
+class NotificationFeedPagination(CursorPagination):
+    """
+    Keyset pagination over (created_at, id): each page is an index seek on
+    notif_user_feed_idx, so page N costs the same as page 1.
+    """
+    ordering = ('-created_at', '-id')
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class NotificationListView(generics.ListAPIView):
+    """
+    GET: paginated feed of the authenticated user's notifications, newest first.
+    POST: mark a notification as read.
+    """
+    serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = NotificationFeedPagination
 
-    def get(self, request):
-        """
-        Retrieve all notifications (both read and unread) for the authenticated user.
-        """
-        notifications = Notification.objects.filter(user=request.user).order_by('-created_at')
-        data = [
-            {
-                "id": n.id,
-                "message": n.message,
-                "is_read": n.is_read,
-                "created_at": n.created_at
-            }
-            for n in notifications
-        ]
-        return Response(data, status=status.HTTP_200_OK)
+    def get_queryset(self):
+        # Only load the columns the serializer returns; `data` can be large
+        return Notification.objects.filter(user=self.request.user).only(
+            'id', 'message', 'is_read', 'created_at'
+        )
 
     def post(self, request):
         """
@@ -36,21 +49,35 @@ class NotificationListView(APIView):
             return Response({"error": "Notification ID is required."}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            notification = Notification.objects.get(id=notification_id, user=request.user)
-            notification.is_read = True
-            notification.save()
+            notification = Notification.objects.only('id', 'user_id', 'is_read').get(id=notification_id, user=request.user)
+            notification.mark_as_read()
             return Response({"status": "success", "message": "Notification marked as read."}, status=status.HTTP_200_OK)
         except Notification.DoesNotExist:
             return Response({"error": "Notification not found."}, status=status.HTTP_404_NOT_FOUND)
 
+def unread_count_response(request):
+    """
+    Unread count from the per-user cache counter. The body is just the count,
+    so an ETag derived from it is exact and pollers get a bodiless 304 until
+    it changes.
+    """
+    count = get_unread_count(request.user.id)
+    etag = f'"unread-{request.user.id}-{count}"'
+    if etag in request.META.get('HTTP_IF_NONE_MATCH', ''):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = Response({"count": count}, status=status.HTTP_200_OK)
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def unread_notification_count(request):
     """
     Get count of unread notifications for the current user.
     """
-    count = Notification.objects.filter(user=request.user, is_read=False).count()
-    return Response({"count": count}, status=status.HTTP_200_OK)
+    return unread_count_response(request)
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
@@ -59,6 +86,7 @@ def mark_all_as_read(request):
     Mark all unread notifications as read for the current user.
     """
     Notification.objects.filter(user=request.user, is_read=False).update(is_read=True)
+    set_unread_count(request.user.id, 0)
     return Response({"status": "success"}, status=status.HTTP_200_OK)
 
 class UnreadNotificationsView(APIView):
@@ -69,29 +97,8 @@ class UnreadNotificationsView(APIView):
         Retrieve the count of unread notifications for the authenticated user.
         """
         try:
-            # Fetch unread notifications count for the authenticated user
-            unread_count = Notification.objects.filter(user=request.user, is_read=False).count()
-            return Response({'count': unread_count}, status=200)
+            return unread_count_response(request)
 
         except Exception as e:
-            # Log unexpected errors
-            print(f"Error fetching unread notifications: {str(e)}")
+            logger.exception("Error fetching unread notifications")
             return Response({'detail': 'An error occurred while fetching unread notifications.'}, status=500)
-
-@api_view(['GET'])
-@permission_classes([IsAuthenticated])
-def notifications(request):
-    """
-    Retrieve all notifications for the authenticated user.
-    """
-    notifications = Notification.objects.filter(user=request.user).order_by('-created_at')
-    data = [
-        {
-            "id": n.id,
-            "message": n.message,
-            "is_read": n.is_read,
-            "created_at": n.created_at,
-        }
-        for n in notifications
-    ]
-    return Response(data, status=200)
@@ -0,0 +1,14 @@
+from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+class RentalsAppConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'rentals_app'
+
+    def ready(self):
+        # Connect the catalog cache invalidation and thumbnail receivers
+        from . import cache, images  # noqa: F401
+        from .search import restore_sqlite_search_triggers
+
+        post_migrate.connect(restore_sqlite_search_triggers, sender=self)
@@ -0,0 +1,102 @@
+"""
+Read-through cache for the public rental catalog.
+
+List pages are cached under a shared version number that any rental change
+bumps, so every cached page goes stale at once without scanning keys.
+Detail payloads are keyed per rental and deleted individually. Both are
+invalidated after the writing transaction commits, so a concurrent reader
+cannot re-cache the old row in between.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Rental
+
+LIST_VERSION_KEY = 'rentals:list:version'
+
+
+def _detail_version_key(pk):
+    return f'rentals:detail:{pk}:version'
+
+
+def catalog_cache():
+    return caches['catalog']
+
+
+def _request_fingerprint(request):
+    # Image URLs are absolute, so the host is part of the payload
+    params = sorted(request.query_params.lists())
+    raw = f'{request.scheme}://{request.get_host()}|{params}'
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def _version(key):
+    # Versions start from the clock rather than 1: if the LRU culls a version
+    # key, its replacement can never collide with payloads stored under the
+    # old one
+    return catalog_cache().get_or_set(key, time.time_ns() // 1000, timeout=None)
+
+
+def list_key(request):
+    return f'rentals:list:v{_version(LIST_VERSION_KEY)}:{_request_fingerprint(request)}'
+
+
+def detail_key(request, pk):
+    return f'rentals:detail:{pk}:v{_version(_detail_version_key(pk))}:{_request_fingerprint(request)}'
+
+
+def get_payload(key):
+    return catalog_cache().get(key)
+
+
+def store_payload(key, data):
+    catalog_cache().set(key, data, settings.CATALOG_CACHE_TTL)
+
+
+def invalidate_rental(pk):
+    """Drop a rental's detail payloads and every cached list page."""
+    def invalidate():
+        cache = catalog_cache()
+        # Detail payloads vary by host too, so each rental has its own
+        # version and one bump covers all of them
+        for key in (LIST_VERSION_KEY, _detail_version_key(pk)):
+            try:
+                cache.incr(key)
+            except ValueError:
+                pass  # No version yet means nothing is cached under it
+
+    transaction.on_commit(invalidate)
+
+
+def invalidate_rentals(pks):
+    """invalidate_rental() for many rentals at once, e.g. after bulk writes."""
+    pks = list(pks)
+
+    def invalidate():
+        cache = catalog_cache()
+        try:
+            cache.incr(LIST_VERSION_KEY)
+        except ValueError:
+            pass
+        # Dropping a version key orphans its payloads: the next read starts
+        # a new clock-based version. One round trip instead of one per rental.
+        cache.delete_many([_detail_version_key(pk) for pk in pks])
+
+    if pks:
+        transaction.on_commit(invalidate)
+
+
+@receiver(post_save, sender=Rental)
+def invalidate_saved_rental(sender, instance, **kwargs):
+    invalidate_rental(instance.pk)
+
+
+@receiver(post_delete, sender=Rental)
+def invalidate_deleted_rental(sender, instance, **kwargs):
+    invalidate_rental(instance.pk)
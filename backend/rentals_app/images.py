@@ -0,0 +1,117 @@
+"""
+Resized derivatives of rental images for responsive <img srcset>.
+
+Each upload is rendered at the widths in RENTAL_THUMBNAIL_WIDTHS, once as
+WebP and once as JPEG, and stored under rentals/thumbs/ with a hash of
+the original's path in the name. Rental.image_variants records the stored
+names together with the original they were made from, so a replaced image
+is detected and re-rendered.
+
+Rendering runs on a small background thread pool after the upload commits;
+`manage.py generate_thumbnails` backfills existing images across processes.
+The resizing itself lives in rendering.py, which only deals in bytes so it
+can run in either.
+"""
+import atexit
+import hashlib
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .cache import invalidate_rental
+from .models import Rental
+from .rendering import FORMATS, render_variants
+
+logger = logging.getLogger(__name__)
+
+
+def thumbnail_widths():
+    return tuple(getattr(settings, 'RENTAL_THUMBNAIL_WIDTHS', (320, 640, 1024)))
+
+
+def variant_name(image_name, width, format_name):
+    # The path hash keeps products/car.jpg and uploads/car.jpg apart
+    stem = os.path.splitext(os.path.basename(image_name))[0]
+    digest = hashlib.sha1(image_name.encode()).hexdigest()[:8]
+    return f'rentals/thumbs/{stem}-{digest}-{width}w.{FORMATS[format_name][1]}'
+
+
+def read_source(image_name):
+    with default_storage.open(image_name, 'rb') as f:
+        return f.read()
+
+
+def store_variants(rental_id, image_name, rendered):
+    """
+    Save rendered derivatives and record them on the rental, unless its image
+    was replaced in the meantime. Returns True when the rental was updated.
+    """
+    variants = {'source': image_name}
+    for format_name, width, data in rendered:
+        name = variant_name(image_name, width, format_name)
+        if default_storage.exists(name):
+            default_storage.delete(name)
+        variants.setdefault(format_name, {})[str(width)] = default_storage.save(name, ContentFile(data))
+
+    updated = Rental.objects.filter(pk=rental_id, image=image_name).update(image_variants=variants)
+    if updated:
+        # update() skips post_save, so drop cached catalog payloads here
+        invalidate_rental(rental_id)
+    return bool(updated)
+
+
+def generate_variants(rental_id, image_name):
+    store_variants(rental_id, image_name, render_variants(read_source(image_name), thumbnail_widths()))
+
+
+def needs_variants(rental):
+    return bool(rental.image) and (rental.image_variants or {}).get('source') != rental.image.name
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'RENTAL_THUMBNAIL_WORKERS', 1),
+                    thread_name_prefix='rental-thumbnails',
+                )
+                atexit.register(_executor.shutdown)
+    return _executor
+
+
+def _generate_in_background(rental_id, image_name):
+    try:
+        close_old_connections()
+        generate_variants(rental_id, image_name)
+    except Exception:
+        logger.exception("Failed to render thumbnails for rental %s (%s)", rental_id, image_name)
+    finally:
+        close_old_connections()
+
+
+def schedule_variants(rental_id, image_name):
+    """Render derivatives off the request thread once the upload commits."""
+    if getattr(settings, 'RENTAL_THUMBNAIL_WORKERS', 1) <= 0:
+        transaction.on_commit(lambda: _generate_in_background(rental_id, image_name))
+    else:
+        transaction.on_commit(lambda: get_executor().submit(_generate_in_background, rental_id, image_name))
+
+
+@receiver(post_save, sender=Rental)
+def render_uploaded_image(sender, instance, raw=False, **kwargs):
+    if not raw and needs_variants(instance):
+        schedule_variants(instance.pk, instance.image.name)
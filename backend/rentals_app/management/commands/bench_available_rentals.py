@@ -0,0 +1,104 @@
+import random
+import statistics
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.test import APIRequestFactory
+
+from auth_app.models import User
+from backend.transactions import rolled_back
+from booking_app.models import Booking
+from rentals_app.models import Rental
+from rentals_app.views import AvailableRentalListView
+
+CATEGORIES = ['Cars', 'Machinery', 'Generators', 'Tools', 'Electronics']
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a large catalog inside a transaction, time GET /api/rentals/available/ '
+        'and fail if the p95 latency exceeds the budget. The seed data is rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rentals', type=int, default=100_000)
+        parser.add_argument('--bookings', type=int, default=1_000_000)
+        parser.add_argument('--runs', type=int, default=50)
+        parser.add_argument('--budget-ms', type=float, default=50.0)
+        parser.add_argument('--batch-size', type=int, default=10_000)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        random.seed(options['seed'])
+        with rolled_back():
+            self.seed(options)
+            timings = self.measure(options['runs'])
+
+        p50 = statistics.median(timings)
+        p95 = sorted(timings)[max(0, int(len(timings) * 0.95) - 1)]
+        self.stdout.write(f'runs={len(timings)} p50={p50:.2f}ms p95={p95:.2f}ms max={max(timings):.2f}ms')
+        if p95 > options['budget_ms']:
+            raise CommandError(f'p95 {p95:.2f}ms exceeds the {options["budget_ms"]:.0f}ms budget')
+        self.stdout.write(self.style.SUCCESS(f'Within the {options["budget_ms"]:.0f}ms budget'))
+
+    def seed(self, options):
+        batch_size = options['batch_size']
+        started = time.perf_counter()
+        user = User.objects.create_user(username='bench-availability', password=None)
+
+        Rental.objects.bulk_create(
+            (
+                Rental(
+                    name=f'Bench rental {i}',
+                    category=CATEGORIES[i % len(CATEGORIES)],
+                    details='Seeded by bench_available_rentals',
+                    price=random.randint(10, 500),
+                    image='rentals/doge.jpg',
+                )
+                for i in range(options['rentals'])
+            ),
+            batch_size=batch_size,
+        )
+        rental_ids = list(Rental.objects.values_list('id', flat=True))
+
+        today = date.today()
+
+        def bookings():
+            for _ in range(options['bookings']):
+                # Mostly history, with a tail of upcoming bookings
+                start = today + timedelta(days=random.randint(-730, 60))
+                end = start + timedelta(days=random.randint(0, 7))
+                yield Booking(
+                    user=user,
+                    rental_id=random.choice(rental_ids),
+                    start_date=start,
+                    end_date=end,
+                    total_price=100,
+                )
+
+        Booking.objects.bulk_create(bookings(), batch_size=batch_size)
+        self.stdout.write(
+            f'Seeded {options["rentals"]} rentals and {options["bookings"]} bookings '
+            f'in {time.perf_counter() - started:.1f}s'
+        )
+
+    def measure(self, runs):
+        factory = APIRequestFactory()
+        view = AvailableRentalListView.as_view()
+        today = date.today()
+        timings = []
+        for i in range(runs):
+            start = today + timedelta(days=random.randint(0, 30))
+            end = start + timedelta(days=random.randint(1, 14))
+            params = {'start': start.isoformat(), 'end': end.isoformat()}
+            if i % 2:
+                params['category'] = random.choice(CATEGORIES)
+            request = factory.get('/api/rentals/available/', params)
+            began = time.perf_counter()
+            response = view(request)
+            response.render()
+            timings.append((time.perf_counter() - began) * 1000)
+            if response.status_code != 200:
+                raise CommandError(f'Unexpected status {response.status_code}: {response.content[:200]!r}')
+        return timings
@@ -0,0 +1,53 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import connection
+
+from rentals_app.models import Rental
+
+
+class Command(BaseCommand):
+    help = (
+        'Simulate request cycles (request_started, a catalog query, request_finished) '
+        'with a new connection per request and with persistent connections, and '
+        'report the per-request latency that reusing the connection saves.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--conn-max-age', type=int, default=600,
+                            help="CONN_MAX_AGE for the persistent run.")
+
+    def handle(self, *args, **options):
+        original = connection.settings_dict['CONN_MAX_AGE']
+        try:
+            per_request = self.measure(0, options['requests'])
+            persistent = self.measure(options['conn_max_age'], options['requests'])
+        finally:
+            connection.close()
+            connection.settings_dict['CONN_MAX_AGE'] = original
+
+        self.stdout.write(f"backend={connection.vendor} requests={options['requests']}")
+        for label, timings in (('CONN_MAX_AGE=0', per_request),
+                               (f"CONN_MAX_AGE={options['conn_max_age']}", persistent)):
+            p95 = sorted(timings)[max(0, int(len(timings) * 0.95) - 1)]
+            self.stdout.write(f'{label:<20} mean={statistics.mean(timings):.3f}ms p95={p95:.3f}ms')
+        saved = statistics.mean(per_request) - statistics.mean(persistent)
+        self.stdout.write(self.style.SUCCESS(f'Persistent connections save {saved:.3f}ms per request'))
+
+    def measure(self, conn_max_age, requests):
+        # CONN_MAX_AGE is read when a connection opens, so start from none
+        connection.close()
+        connection.settings_dict['CONN_MAX_AGE'] = conn_max_age
+        timings = []
+        for _ in range(requests):
+            started = time.perf_counter()
+            # The same signals WSGIHandler sends; close_old_connections is
+            # connected to both and closes or keeps the connection
+            request_started.send(sender=self.__class__)
+            list(Rental.objects.filter(is_available=True).values_list('id', flat=True)[:20])
+            request_finished.send(sender=self.__class__)
+            timings.append((time.perf_counter() - started) * 1000)
+        return timings
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.records import FORMATS, detect_format, write_records
+from rentals_app.models import Rental
+
+FIELDS = ['external_id', 'name', 'category', 'details', 'price', 'is_available', 'image']
+
+
+class Command(BaseCommand):
+    help = (
+        'Stream the rental catalog to a CSV or JSONL file in the format '
+        'import_rentals reads. Rows are fetched in chunks, so memory stays flat '
+        'for any catalog size. Image names are relative to MEDIA_ROOT; pass that '
+        'as --images-dir when importing them elsewhere.'
+    )
+
+    def add_arguments(self, parser):
+        # Not stdout: the logging config writes there too
+        parser.add_argument('--output', required=True, help="File to write.")
+        parser.add_argument('--format', choices=FORMATS)
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        try:
+            fmt = detect_format(options['output'], options['format'])
+        except ValueError as e:
+            raise CommandError(str(e))
+        rows = (
+            dict(zip(FIELDS, values))
+            for values in Rental.objects.order_by('id').values_list(*FIELDS).iterator(chunk_size=options['chunk_size'])
+        )
+        with open(options['output'], 'w', newline='', encoding='utf-8') as f:
+            count = write_records(f, fmt, FIELDS, rows)
+        self.stdout.write(self.style.SUCCESS(f"Exported {count} rental(s) to {options['output']}."))
@@ -0,0 +1,62 @@
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from django.core.management.base import BaseCommand
+
+from rentals_app.images import needs_variants, read_source, store_variants, thumbnail_widths
+from rentals_app.models import Rental
+from rentals_app.rendering import render_variants
+
+
+class Command(BaseCommand):
+    help = (
+        'Render responsive thumbnails for rental images that do not have them yet. '
+        'Resizing runs across a process pool; files are read and stored here.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+        parser.add_argument('--force', action='store_true', help="Re-render images that already have thumbnails.")
+        parser.add_argument('--rental', type=int, action='append', dest='rentals',
+                            help="Only this rental id (may be repeated).")
+
+    def handle(self, *args, **options):
+        rentals = Rental.objects.exclude(image='').only('id', 'image', 'image_variants').order_by('id')
+        if options['rentals']:
+            rentals = rentals.filter(id__in=options['rentals'])
+        widths = thumbnail_widths()
+        # Keep a couple of images per worker in flight so memory stays bounded
+        max_pending = options['workers'] * 2
+        done = failed = 0
+
+        with ProcessPoolExecutor(max_workers=options['workers']) as executor:
+            pending = {}
+
+            def collect(futures):
+                nonlocal done, failed
+                for future in futures:
+                    rental_id, image_name = pending.pop(future)
+                    try:
+                        store_variants(rental_id, image_name, future.result())
+                        done += 1
+                    except Exception as e:
+                        failed += 1
+                        self.stderr.write(f'Rental {rental_id} ({image_name}): {e}')
+
+            for rental in rentals.iterator(chunk_size=500):
+                if not options['force'] and not needs_variants(rental):
+                    continue
+                try:
+                    source = read_source(rental.image.name)
+                except OSError as e:
+                    failed += 1
+                    self.stderr.write(f'Rental {rental.id} ({rental.image.name}): {e}')
+                    continue
+                pending[executor.submit(render_variants, source, widths)] = (rental.id, rental.image.name)
+                if len(pending) >= max_pending:
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(finished)
+            collect(list(pending))
+
+        style = self.style.SUCCESS if not failed else self.style.WARNING
+        self.stdout.write(style(f'Rendered thumbnails for {done} rental(s), {failed} failed.'))
@@ -0,0 +1,197 @@
+import hashlib
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils.text import slugify
+
+from backend.records import FORMATS, RecordError, batched, read_records
+from rentals_app.cache import invalidate_rentals
+from rentals_app.models import Rental
+
+UPDATE_FIELDS = ['name', 'category', 'details', 'price', 'is_available', 'image']
+TRUE_VALUES = {'1', 'true', 't', 'yes', 'y'}
+FALSE_VALUES = {'0', 'false', 'f', 'no', 'n'}
+
+
+def store_image(images_dir, filename):
+    """
+    Copy an image into storage under a name derived from its content, so a
+    re-import of an unchanged file reuses the stored copy. Files already under
+    MEDIA_ROOT are referenced as they are.
+    """
+    path = os.path.realpath(os.path.join(images_dir, filename))
+    if os.path.commonpath([path, images_dir]) != images_dir:
+        raise ValueError(f'{filename!r} is outside the images directory')
+    if images_dir == os.path.realpath(settings.MEDIA_ROOT):
+        # Already in storage, e.g. re-importing an export_rentals file
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f'No such file: {filename!r}')
+        return os.path.relpath(path, images_dir)
+    with open(path, 'rb') as f:
+        data = f.read()
+    stem, extension = os.path.splitext(os.path.basename(filename))
+    name = f'rentals/imported/{slugify(stem)[:80] or "image"}-{hashlib.sha1(data).hexdigest()[:12]}{extension.lower()}'
+    if not default_storage.exists(name):
+        name = default_storage.save(name, ContentFile(data))
+    return name
+
+
+class Command(BaseCommand):
+    help = (
+        'Create or update rentals from a CSV (with a header row) or JSONL file with '
+        'the fields external_id, name, category, details, price, is_available and '
+        'image (a file name under --images-dir). Rows are matched on external_id, so '
+        're-running an import only writes what changed. Each batch is one bulk '
+        'INSERT plus one bulk UPDATE; images are copied into storage on worker '
+        'threads. Lines that cannot be parsed are reported and counted as invalid.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=FORMATS)
+        parser.add_argument('--images-dir', default=os.path.join(settings.BASE_DIR, '..', 'products'))
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--workers', type=int, default=8, help="Threads copying images.")
+
+    def handle(self, *args, **options):
+        images_dir = os.path.realpath(options['images_dir'])
+        stored_images = {}  # file name -> storage name, for images shared by several rows
+        counts = dict.fromkeys(('created', 'updated', 'unchanged', 'invalid'), 0)
+        processed = 0
+        started = time.perf_counter()
+
+        try:
+            records = read_records(options['path'], options['format'], report_errors=True)
+            with ThreadPoolExecutor(max_workers=options['workers'], thread_name_prefix='import-images') as executor:
+                for batch in batched(records, options['batch_size']):
+                    processed += len(batch)
+                    rows = {}
+                    for number, record in batch:
+                        try:
+                            if isinstance(record, RecordError):
+                                raise ValidationError(str(record))
+                            row = self.clean(record)
+                        except ValidationError as e:
+                            counts['invalid'] += 1
+                            self.stderr.write(f"Line {number}: {'; '.join(e.messages)}")
+                            continue
+                        rows[row['external_id']] = (number, row)  # A later duplicate wins
+
+                    self.attach_images(executor, images_dir, rows, stored_images, counts)
+                    self.write_batch([row for _, row in rows.values()], counts)
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        elapsed = time.perf_counter() - started
+        style = self.style.SUCCESS if not counts['invalid'] else self.style.WARNING
+        self.stdout.write(style(
+            f"{processed} row(s) in {elapsed:.1f}s ({processed / elapsed if elapsed else 0:.0f} rows/s): "
+            f"{counts['created']} created, {counts['updated']} updated, {counts['unchanged']} unchanged, "
+            f"{counts['invalid']} invalid."
+        ))
+        if counts['created'] or counts['updated']:
+            self.stdout.write('Run `manage.py generate_thumbnails` to render thumbnails for new images.')
+
+    def clean(self, record):
+        errors = []
+        row = {'external_id': str(record.get('external_id') or '').strip()}
+        for field in ('name', 'category'):
+            row[field] = str(record.get(field) or '').strip()
+            if not row[field]:
+                errors.append(f'{field} is required')
+        if not row['external_id']:
+            errors.append('external_id is required')
+        row['details'] = str(record.get('details') or '')
+        try:
+            row['price'] = self.clean_price(record.get('price'))
+        except ValidationError as e:
+            errors.extend(f"invalid price {record.get('price')!r}: {message}" for message in e.messages)
+
+        available = record.get('is_available', True)
+        if isinstance(available, str):
+            if available.strip().lower() not in TRUE_VALUES | FALSE_VALUES | {''}:
+                errors.append(f'invalid is_available {available!r}')
+            available = available.strip().lower() not in FALSE_VALUES
+        row['is_available'] = bool(available)
+        # None leaves an existing rental's image alone
+        row['image'] = str(record.get('image') or '').strip() or None
+        if errors:
+            raise ValidationError(errors)
+        return row
+
+    def clean_price(self, value):
+        """
+        A price the column can hold. Anything bulk_create would reject fails
+        here instead, so one bad row cannot abort its whole batch.
+        """
+        field = Rental._meta.get_field('price')
+        try:
+            price = Decimal(str(value))
+        except InvalidOperation:
+            raise ValidationError('not a number')
+        if not price.is_finite():
+            raise ValidationError('must be a finite number')
+        if price < 0:
+            raise ValidationError('must not be negative')
+        try:
+            price = price.quantize(Decimal(1).scaleb(-field.decimal_places))
+        except InvalidOperation:
+            raise ValidationError(f'must have at most {field.max_digits} digits')
+        field.run_validators(price)  # max_digits
+        return price
+
+    def attach_images(self, executor, images_dir, rows, stored_images, counts):
+        pending = {filename for _, row in rows.values() if (filename := row['image'])} - stored_images.keys()
+        futures = {filename: executor.submit(store_image, images_dir, filename) for filename in pending}
+        for filename, future in futures.items():
+            try:
+                stored_images[filename] = future.result()
+            except (OSError, ValueError) as e:
+                stored_images[filename] = e
+        for external_id, (number, row) in list(rows.items()):
+            if row['image'] is None:
+                continue
+            stored = stored_images[row['image']]
+            if isinstance(stored, Exception):
+                counts['invalid'] += 1
+                self.stderr.write(f"Line {number}: image {row['image']!r}: {stored}")
+                del rows[external_id]
+            else:
+                row['image'] = stored
+
+    def write_batch(self, rows, counts):
+        existing = Rental.objects.filter(external_id__in=[row['external_id'] for row in rows]).only(
+            'external_id', *UPDATE_FIELDS).in_bulk(field_name='external_id')
+        creates, updates = [], []
+        for row in rows:
+            rental = existing.get(row['external_id'])
+            if rental is None:
+                creates.append(Rental(**{**row, 'image': row['image'] or ''}))
+                continue
+            changed = False
+            for field in UPDATE_FIELDS:
+                value = row[field]
+                current = rental.image.name if field == 'image' else getattr(rental, field)
+                if value is not None and current != value:
+                    setattr(rental, field, value)
+                    changed = True
+            if changed:
+                updates.append(rental)
+            else:
+                counts['unchanged'] += 1
+
+        with transaction.atomic():
+            Rental.objects.bulk_create(creates)
+            Rental.objects.bulk_update(updates, UPDATE_FIELDS)
+            # Bulk writes skip the post_save cache invalidation
+            invalidate_rentals(rental.pk for rental in creates + updates)
+        counts['created'] += len(creates)
+        counts['updated'] += len(updates)
@@ -0,0 +1,33 @@
+# Generated by Django 5.2 on 2026-10-17 11:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rentals_app', '0002_rename_available_rental_is_available'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='rental',
+            index=models.Index(fields=['category', 'is_available', 'price'], name='rental_cat_avail_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rental',
+            index=models.Index(fields=['is_available', 'price'], name='rental_avail_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rental',
+            index=models.Index(condition=models.Q(('is_available', True)), fields=['id'], name='rental_listed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rental',
+            index=models.Index(condition=models.Q(('is_available', False)), fields=['id'], name='rental_unlisted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rental',
+            index=models.Index(fields=['price'], name='rental_price_idx'),
+        ),
+    ]
@@ -0,0 +1,59 @@
+from django.db import migrations
+
+SQLITE_FORWARD = [
+    # External-content FTS5 table: the text lives only in rentals_app_rental,
+    # the triggers keep the full-text index in step with it.
+    """CREATE VIRTUAL TABLE rentals_app_rental_fts USING fts5(
+        name, details, content='rentals_app_rental', content_rowid='id'
+    )""",
+    """CREATE TRIGGER rentals_app_rental_fts_ai AFTER INSERT ON rentals_app_rental BEGIN
+        INSERT INTO rentals_app_rental_fts(rowid, name, details) VALUES (new.id, new.name, new.details);
+    END""",
+    """CREATE TRIGGER rentals_app_rental_fts_ad AFTER DELETE ON rentals_app_rental BEGIN
+        INSERT INTO rentals_app_rental_fts(rentals_app_rental_fts, rowid, name, details)
+        VALUES ('delete', old.id, old.name, old.details);
+    END""",
+    """CREATE TRIGGER rentals_app_rental_fts_au AFTER UPDATE OF name, details ON rentals_app_rental BEGIN
+        INSERT INTO rentals_app_rental_fts(rentals_app_rental_fts, rowid, name, details)
+        VALUES ('delete', old.id, old.name, old.details);
+        INSERT INTO rentals_app_rental_fts(rowid, name, details) VALUES (new.id, new.name, new.details);
+    END""",
+    "INSERT INTO rentals_app_rental_fts(rentals_app_rental_fts) VALUES ('rebuild')",
+]
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS rentals_app_rental_fts_au",
+    "DROP TRIGGER IF EXISTS rentals_app_rental_fts_ad",
+    "DROP TRIGGER IF EXISTS rentals_app_rental_fts_ai",
+    "DROP TABLE IF EXISTS rentals_app_rental_fts",
+]
+
+# Must match the expression in rentals_app/search.py for the planner to use it
+POSTGRES_FORWARD = [
+    """CREATE INDEX rental_search_gin_idx ON rentals_app_rental USING GIN (
+        to_tsvector('english', coalesce(name, '') || ' ' || coalesce(details, ''))
+    )""",
+]
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS rental_search_gin_idx",
+]
+
+
+def run(statements_by_vendor):
+    def operation(apps, schema_editor):
+        for statement in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rentals_app', '0003_catalog_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run({'sqlite': SQLITE_FORWARD, 'postgresql': POSTGRES_FORWARD}),
+            run({'sqlite': SQLITE_BACKWARD, 'postgresql': POSTGRES_BACKWARD}),
+        ),
+    ]
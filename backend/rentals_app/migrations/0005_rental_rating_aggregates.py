@@ -0,0 +1,50 @@
+# Generated by Django 5.2 on 2026-10-17 11:48
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill_ratings(apps, schema_editor):
+    Rental = apps.get_model('rentals_app', 'Rental')
+    Review = apps.get_model('reviews_app', 'Review')
+    totals = Review.objects.order_by().values('rental_id').annotate(total=Sum('rating'), count=Count('id'))
+    rentals = []
+    for row in totals:
+        rentals.append(Rental(
+            id=row['rental_id'],
+            rating_sum=row['total'] or 0,
+            rating_count=row['count'],
+            rating_avg=(row['total'] or 0) / row['count'],
+        ))
+    Rental.objects.bulk_update(rentals, ['rating_sum', 'rating_count', 'rating_avg'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rentals_app', '0004_rental_search_index'),
+        ('reviews_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rental',
+            name='rating_avg',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='rental',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='rental',
+            name='rating_sum',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='rental',
+            index=models.Index(fields=['rating_avg', 'id'], name='rental_rating_idx'),
+        ),
+        migrations.RunPython(backfill_ratings, migrations.RunPython.noop),
+    ]
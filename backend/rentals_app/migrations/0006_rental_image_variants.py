@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-17 11:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rentals_app', '0005_rental_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rental',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-17 12:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rentals_app', '0006_rental_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rental',
+            name='external_id',
+            field=models.CharField(blank=True, max_length=255, null=True, unique=True),
+        ),
+    ]
@@ -7,6 +7,30 @@ class Rental(models.Model):
     price = models.DecimalField(decimal_places=2, max_digits=10)
     is_available = models.BooleanField(default=True)  # Renamed 'available' to 'is_available' for consistency
     image = models.ImageField(upload_to='rentals/')  # Ensure the image is uploaded to the 'rentals/' directory
+    # Resized WebP/JPEG copies of image, written by rentals_app/images.py
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
+    # Review aggregates, maintained by reviews_app/ratings.py
+    rating_avg = models.FloatField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.IntegerField(default=0)  # Kept so the average is exact, not drifting
+    # Key in a partner catalog; `manage.py import_rentals` matches rows on it
+    external_id = models.CharField(max_length=255, unique=True, null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # One index per catalog filter shape (see RentalListView); the
+            # trailing price column also serves price ranges and sorting.
+            models.Index(fields=['category', 'is_available', 'price'], name='rental_cat_avail_price_idx'),
+            models.Index(fields=['is_available', 'price'], name='rental_avail_price_idx'),
+            # Availability alone, in the default id order. Django renders the
+            # boolean filter as a bare column test, which partial indexes
+            # match but a plain (is_available, ...) index does not on SQLite.
+            models.Index(fields=['id'], condition=models.Q(is_available=True), name='rental_listed_idx'),
+            models.Index(fields=['id'], condition=models.Q(is_available=False), name='rental_unlisted_idx'),
+            models.Index(fields=['price'], name='rental_price_idx'),
+            # Top-rated sorting and min_rating filtering
+            models.Index(fields=['rating_avg', 'id'], name='rental_rating_idx'),
+        ]
 
     def __str__(self):
         return self.name
\ No newline at end of file
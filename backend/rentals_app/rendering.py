@@ -0,0 +1,41 @@
+"""
+Resizing for rental thumbnails (see images.py).
+
+Deliberately free of Django imports: generate_thumbnails runs
+render_variants() in a process pool, and under the spawn and forkserver
+start methods each worker imports this module without setting Django up.
+"""
+import io
+
+from PIL import Image, ImageOps
+
+# Format name in image_variants -> (Pillow format, file extension, save options)
+FORMATS = {
+    'webp': ('WEBP', 'webp', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', 'jpg', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+
+def render_variants(source, widths):
+    """
+    Render every (format, width) derivative of the image in `source` (bytes).
+    Widths wider than the original are skipped; if the original is narrower
+    than all of them it is re-encoded once at its own width. Returns a list
+    of (format, width, bytes).
+    """
+    with Image.open(io.BytesIO(source)) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+        targets = sorted({w for w in widths if w < image.width} or {image.width})
+
+        rendered = []
+        for width in targets:
+            height = max(1, round(image.height * width / image.width))
+            resized = image.resize((width, height), Image.LANCZOS) if width != image.width else image
+            for name, (pil_format, _, options) in FORMATS.items():
+                frame = resized.convert('RGB') if pil_format == 'JPEG' and resized.mode != 'RGB' else resized
+                buffer = io.BytesIO()
+                frame.save(buffer, pil_format, **options)
+                rendered.append((name, width, buffer.getvalue()))
+        return rendered
@@ -0,0 +1,86 @@
+"""
+Full-text search over rental name and details.
+
+PostgreSQL matches against the GIN-indexed tsvector expression created in
+migration 0004; SQLite queries the FTS5 shadow table from the same
+migration. Other backends fall back to a plain icontains scan.
+
+SQLite rebuilds a table from scratch for most schema changes, which drops
+the triggers that keep the FTS5 table current; restore_sqlite_search_triggers
+puts them back after every migrate.
+"""
+import re
+
+from django.db import connections
+from django.db.models import BooleanField, Q
+from django.db.models.expressions import RawSQL
+
+SEARCH_VECTOR_SQL = "to_tsvector('english', coalesce(name, '') || ' ' || coalesce(details, ''))"
+
+FTS_TABLE = 'rentals_app_rental_fts'
+
+# Same triggers as migration 0004
+SQLITE_TRIGGERS = {
+    'rentals_app_rental_fts_ai': """CREATE TRIGGER rentals_app_rental_fts_ai AFTER INSERT ON rentals_app_rental BEGIN
+        INSERT INTO rentals_app_rental_fts(rowid, name, details) VALUES (new.id, new.name, new.details);
+    END""",
+    'rentals_app_rental_fts_ad': """CREATE TRIGGER rentals_app_rental_fts_ad AFTER DELETE ON rentals_app_rental BEGIN
+        INSERT INTO rentals_app_rental_fts(rentals_app_rental_fts, rowid, name, details)
+        VALUES ('delete', old.id, old.name, old.details);
+    END""",
+    'rentals_app_rental_fts_au': """CREATE TRIGGER rentals_app_rental_fts_au AFTER UPDATE OF name, details ON rentals_app_rental BEGIN
+        INSERT INTO rentals_app_rental_fts(rentals_app_rental_fts, rowid, name, details)
+        VALUES ('delete', old.id, old.name, old.details);
+        INSERT INTO rentals_app_rental_fts(rowid, name, details) VALUES (new.id, new.name, new.details);
+    END""",
+}
+
+
+def restore_sqlite_search_triggers(sender, using='default', **kwargs):
+    """post_migrate receiver: recreate missing FTS5 triggers and reindex."""
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger') AND name LIKE %s",
+            (FTS_TABLE + '%',),
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        missing = [name for name in SQLITE_TRIGGERS if name not in existing]
+        if FTS_TABLE not in existing or not missing:
+            return
+        for name in missing:
+            cursor.execute(SQLITE_TRIGGERS[name])
+        # Rows written while the triggers were gone are not indexed yet
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def fts5_query(text):
+    """Turn free text into an FTS5 query: every word must match, as a prefix."""
+    words = re.findall(r'\w+', text)
+    return ' '.join('"{}"*'.format(word.replace('"', '""')) for word in words)
+
+
+def search_rentals(queryset, text):
+    text = text.strip()
+    if not text:
+        return queryset
+
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql':
+        return queryset.alias(
+            search_match=RawSQL(
+                f"{SEARCH_VECTOR_SQL} @@ plainto_tsquery('english', %s)", (text,), output_field=BooleanField()
+            )
+        ).filter(search_match=True)
+
+    if connection.vendor == 'sqlite':
+        query = fts5_query(text)
+        if not query:
+            return queryset.none()
+        return queryset.filter(id__in=RawSQL(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", (query,)
+        ))
+
+    return queryset.filter(Q(name__icontains=text) | Q(details__icontains=text))
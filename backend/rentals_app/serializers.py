@@ -1,7 +1,30 @@
 from rest_framework import serializers
 from .models import Rental
 
+
 class RentalSerializer(serializers.ModelSerializer):
+    # {"webp": "<url> 320w, <url> 640w, ...", "jpeg": "..."}; empty until the
+    # thumbnails have been rendered
+    srcset = serializers.SerializerMethodField()
+
     class Meta:
         model = Rental
-        fields = '__all__'  # Ensure all fields, including the image field, are included
+        exclude = ['rating_sum', 'image_variants']  # Every other field, including the image field
+        read_only_fields = ['rating_avg', 'rating_count', 'external_id']
+
+    def get_srcset(self, obj):
+        variants = obj.image_variants or {}
+        if variants.get('source') != obj.image.name:
+            return {}
+        storage = obj.image.storage
+        request = self.context.get('request')
+        srcset = {}
+        for format_name, names in variants.items():
+            if format_name == 'source':
+                continue
+            candidates = []
+            for width, name in sorted(names.items(), key=lambda item: int(item[0])):
+                url = storage.url(name)
+                candidates.append(f'{request.build_absolute_uri(url) if request else url} {width}w')
+            srcset[format_name] = ', '.join(candidates)
+        return srcset
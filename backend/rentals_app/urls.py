@@ -1,7 +1,8 @@
 from django.urls import path
-from .views import RentalListView, RentalDetailView
+from .views import RentalListView, RentalDetailView, AvailableRentalListView
 
 urlpatterns = [
     path('', RentalListView.as_view(), name='rental-list'),  # List and create rentals
+    path('available/', AvailableRentalListView.as_view(), name='rental-available'),  # Rentals free for a date window
     path('<int:pk>/', RentalDetailView.as_view(), name='rental-detail'),  # Retrieve, update, and delete rentals
 ]
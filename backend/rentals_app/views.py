@@ -1,16 +1,81 @@
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
 from rest_framework import generics
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.pagination import CursorPagination
 from .models import Rental
 from .serializers import RentalSerializer
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from .search import search_rentals
+from .cache import detail_key, get_payload, list_key, store_payload
+from booking_app.availability import available_rentals
 import logging
 
 logger = logging.getLogger(__name__)
 
 class RentalListView(generics.ListCreateAPIView):
+    """
+    Catalog listing. Optional query parameters:
+    category, min_price, max_price, min_rating, available (true/false), search
+    (text over name and details) and ordering (price, -price, rating, -rating).
+    """
     queryset = Rental.objects.all()
     serializer_class = RentalSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
 
+    ORDERINGS = {
+        'price': ('price', 'id'),
+        '-price': ('-price', '-id'),
+        'rating': ('rating_avg', 'id'),
+        '-rating': ('-rating_avg', '-id'),
+    }
+
+    def parse_number(self, name):
+        value = self.request.query_params.get(name)
+        if value in (None, ''):
+            return None
+        try:
+            return Decimal(value)
+        except InvalidOperation:
+            raise ValidationError({name: 'Must be a number.'})
+
+    def get_queryset(self):
+        params = self.request.query_params
+        queryset = Rental.objects.all()
+
+        if params.get('category'):
+            queryset = queryset.filter(category=params['category'])
+        if params.get('available') not in (None, ''):
+            queryset = queryset.filter(is_available=params['available'].lower() in ('true', '1', 'yes'))
+        min_price = self.parse_number('min_price')
+        if min_price is not None:
+            queryset = queryset.filter(price__gte=min_price)
+        max_price = self.parse_number('max_price')
+        if max_price is not None:
+            queryset = queryset.filter(price__lte=max_price)
+        min_rating = self.parse_number('min_rating')
+        if min_rating is not None:
+            queryset = queryset.filter(rating_avg__gte=min_rating)
+        if params.get('search'):
+            queryset = search_rentals(queryset, params['search'])
+
+        ordering = params.get('ordering', '')
+        if ordering not in ('', *self.ORDERINGS):
+            raise ValidationError({'ordering': f"Use one of: {', '.join(self.ORDERINGS)}."})
+        return queryset.order_by(*self.ORDERINGS.get(ordering, ('id',)))
+
+    def list(self, request, *args, **kwargs):
+        # Serialized pages are cached per query string; any rental write
+        # invalidates them (see rentals_app/cache.py)
+        key = list_key(request)
+        data = get_payload(key)
+        if data is None:
+            data = super().list(request, *args, **kwargs).data
+            store_payload(key, data)
+        return Response(data)
+
     def perform_create(self, serializer):
         try:
             serializer.save()
@@ -24,6 +89,14 @@ class RentalDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = RentalSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
 
+    def retrieve(self, request, *args, **kwargs):
+        key = detail_key(request, kwargs['pk'])
+        data = get_payload(key)
+        if data is None:
+            data = super().retrieve(request, *args, **kwargs).data
+            store_payload(key, data)
+        return Response(data)
+
     def perform_update(self, serializer):
         try:
             serializer.save()
@@ -39,3 +112,33 @@ class RentalDetailView(generics.RetrieveUpdateDestroyAPIView):
         except Exception as e:
             logger.error(f'Failed to delete product: {str(e)}')  # Log error during product deletion
             raise
+
+class AvailabilityPagination(CursorPagination):
+    # Keyset pagination on the primary key: no COUNT(*) over the anti-join,
+    # and each page stops as soon as it has collected enough free rentals.
+    ordering = 'id'
+
+class AvailableRentalListView(generics.ListAPIView):
+    """
+    Rentals free for a whole date window:
+    GET /api/rentals/available/?start=YYYY-MM-DD&end=YYYY-MM-DD&category=
+    """
+    serializer_class = RentalSerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    pagination_class = AvailabilityPagination
+
+    def parse_date(self, name):
+        value = self.request.query_params.get(name)
+        if not value:
+            raise ValidationError({name: 'This query parameter is required (YYYY-MM-DD).'})
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date()
+        except ValueError:
+            raise ValidationError({name: 'Invalid date format. Use YYYY-MM-DD.'})
+
+    def get_queryset(self):
+        start_date = self.parse_date('start')
+        end_date = self.parse_date('end')
+        if start_date > end_date:
+            raise ValidationError({'end': 'End date cannot be before start date.'})
+        return available_rentals(start_date, end_date, category=self.request.query_params.get('category'))
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class ReviewsAppConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'reviews_app'
+
+    def ready(self):
+        # Connect the receivers that keep Rental rating aggregates current
+        from . import ratings  # noqa: F401
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reviews_app.ratings import recompute_rental_ratings
+
+
+class Command(BaseCommand):
+    help = "Rebuild Rental.rating_avg / rating_count from the Review table."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rental', type=int, action='append', dest='rentals',
+                            help="Only recompute this rental id (may be repeated).")
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            changed = recompute_rental_ratings(options['rentals'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Updated rating aggregates for {changed} rental(s)."))
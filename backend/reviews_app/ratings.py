@@ -0,0 +1,113 @@
+"""
+Keeps Rental.rating_sum / rating_count / rating_avg in step with reviews.
+
+Every review write applies its delta to the rental row in one UPDATE built
+from F() expressions, so concurrent reviews cannot overwrite each other's
+counts and nothing ever aggregates over the Review table at read time.
+`manage.py recompute_ratings` rebuilds the columns from scratch.
+"""
+from django.db.models import Case, Count, F, FloatField, Sum, Value, When
+from django.db.models.functions import Cast
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from rentals_app.cache import invalidate_rental
+from rentals_app.models import Rental
+from .models import Review
+
+
+def apply_rating_delta(rental_id, rating_delta, count_delta):
+    """Add a review's contribution to (or remove it from) a rental's aggregates."""
+    if rental_id is None or (not rating_delta and not count_delta):
+        return
+    # All right-hand sides read the pre-update row, so the average is
+    # computed from the new sum and count in the same statement
+    new_sum = F('rating_sum') + rating_delta
+    new_count = F('rating_count') + count_delta
+    updated = Rental.objects.filter(pk=rental_id).update(
+        rating_sum=new_sum,
+        rating_count=new_count,
+        rating_avg=Case(
+            When(rating_count__lte=-count_delta, then=Value(0.0)),
+            default=Cast(new_sum, FloatField()) / Cast(new_count, FloatField()),
+            output_field=FloatField(),
+        ),
+    )
+    if updated:
+        # update() bypasses post_save, so drop the cached catalog pages here
+        invalidate_rental(rental_id)
+
+
+def _snapshot(instance):
+    # Deferred fields are left out of __dict__; treat them as unknown
+    return instance.__dict__.get('rental_id'), instance.__dict__.get('rating')
+
+
+@receiver(post_init, sender=Review)
+def remember_rating(sender, instance, **kwargs):
+    instance._rating_snapshot = _snapshot(instance) if instance.pk else (None, None)
+
+
+@receiver(post_save, sender=Review)
+def apply_saved_rating(sender, instance, created, **kwargs):
+    old_rental_id, old_rating = instance._rating_snapshot
+    new_rental_id, new_rating = instance.rental_id, instance.rating
+    if created:
+        apply_rating_delta(new_rental_id, new_rating, 1)
+    elif old_rating is None:
+        # Loaded without its rating (e.g. via .only()); rebuild this rental
+        recompute_rental_ratings([new_rental_id])
+    elif old_rental_id != new_rental_id:
+        apply_rating_delta(old_rental_id, -old_rating, -1)
+        apply_rating_delta(new_rental_id, new_rating, 1)
+    else:
+        apply_rating_delta(new_rental_id, new_rating - old_rating, 0)
+    instance._rating_snapshot = _snapshot(instance)
+
+
+@receiver(post_delete, sender=Review)
+def remove_deleted_rating(sender, instance, **kwargs):
+    rental_id, rating = instance._rating_snapshot
+    if rating is None:
+        recompute_rental_ratings([instance.rental_id])
+    else:
+        apply_rating_delta(rental_id, -rating, -1)
+
+
+def recompute_rental_ratings(rental_ids=None, batch_size=1000):
+    """
+    Rebuild the aggregates from the Review table, for the given rentals or
+    for all of them. Returns the number of rentals whose values changed.
+    """
+    reviews = Review.objects.all()
+    rentals = Rental.objects.only('id', 'rating_sum', 'rating_count', 'rating_avg').order_by('id')
+    if rental_ids is not None:
+        reviews = reviews.filter(rental_id__in=rental_ids)
+        rentals = rentals.filter(id__in=rental_ids)
+    totals = {
+        row['rental_id']: (row['total'] or 0, row['count'])
+        for row in reviews.order_by().values('rental_id').annotate(total=Sum('rating'), count=Count('id'))
+    }
+
+    changed = []
+    changed_count = 0
+    for rental in rentals.iterator(chunk_size=batch_size):
+        rating_sum, rating_count = totals.get(rental.id, (0, 0))
+        rating_avg = rating_sum / rating_count if rating_count else 0.0
+        if (rental.rating_sum, rental.rating_count, rental.rating_avg) == (rating_sum, rating_count, rating_avg):
+            continue
+        rental.rating_sum, rental.rating_count, rental.rating_avg = rating_sum, rating_count, rating_avg
+        changed.append(rental)
+        if len(changed) >= batch_size:
+            changed_count += _save_ratings(changed, batch_size)
+            changed = []
+    if changed:
+        changed_count += _save_ratings(changed, batch_size)
+    return changed_count
+
+
+def _save_ratings(rentals, batch_size):
+    Rental.objects.bulk_update(rentals, ['rating_sum', 'rating_count', 'rating_avg'], batch_size=batch_size)
+    for rental in rentals:
+        invalidate_rental(rental.id)
+    return len(rentals)
@@ -3,6 +3,7 @@ import { Link, useNavigate, useLocation } from 'react-router-dom';
 import { Menu, X, Car, Home, Box, LogIn, UserPlus, LayoutDashboard, LogOut, Bell, Settings } from 'lucide-react';
 import { useUser } from '../context/UserContext';
 import axios from 'axios';
+import { subscribeToNotifications } from '../utils/notificationStream';
 
 const Navbar = () => {
   const [isOpen, setIsOpen] = useState(false);
@@ -61,9 +62,8 @@ const Navbar = () => {
 
     fetchUnreadNotifications();
 
-    const intervalId = setInterval(fetchUnreadNotifications, 30000); // Fetch every 30 seconds
-
-    return () => clearInterval(intervalId);
+    // Refresh the count when the server pushes a new notification
+    return subscribeToNotifications(user.token, fetchUnreadNotifications);
   }, [user]);
 
   const handleLogout = async () => {
@@ -17,7 +17,8 @@ const Notifications = () => {
         const response = await axios.get('http://localhost:8000/api/notifications/', {
           headers: { Authorization: `Token ${token}` }, // Ensure "Token" prefix is used
         });
-        setNotifications(response.data);
+        // The feed is cursor-paginated: { next, previous, results }
+        setNotifications(response.data.results);
       } catch (error) {
         console.error('Error fetching notifications:', error);
         setError('Failed to fetch notifications. Please try again later.');
@@ -3,6 +3,7 @@ import { Link, useLocation } from 'react-router-dom';
 import { Home, User, List, Bell, Settings, Box, PlusCircle, ChevronRight, Menu } from 'lucide-react';
 import { useUser } from '../context/UserContext';
 import axios from 'axios';
+import { subscribeToNotifications } from '../utils/notificationStream';
 
 const Sidebar = () => {
   const { user } = useUser();
@@ -86,7 +87,8 @@ const Sidebar = () => {
 
     fetchUnreadNotifications();
 
-    const intervalId = setInterval(fetchUnreadNotifications, 30000);
+    // Refresh the count when the server pushes a new notification
+    const unsubscribe = subscribeToNotifications(user.token, fetchUnreadNotifications);
 
     const handleNotificationUpdate = () => {
       fetchUnreadNotifications();
@@ -95,7 +97,7 @@ const Sidebar = () => {
     window.addEventListener('notifications-updated', handleNotificationUpdate);
 
     return () => {
-      clearInterval(intervalId);
+      unsubscribe();
       window.removeEventListener('notifications-updated', handleNotificationUpdate);
     };
   }, [user]);
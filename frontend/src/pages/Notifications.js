@@ -41,7 +41,8 @@ const Notifications = () => {
           // Dispatch event to update sidebar after getting notifications
           const event = new CustomEvent('notifications-updated');
           window.dispatchEvent(event);
-          setNotifications(res.data);
+          // The feed is cursor-paginated: { next, previous, results }
+          setNotifications(res.data.results);
           setIsLoading(false);
         })
         .catch(err => {
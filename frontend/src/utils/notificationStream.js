@@ -0,0 +1,120 @@
+const API_BASE_URL = 'http://localhost:8000';
+const LONG_POLL_TIMEOUT = 25; // Seconds; the server caps it at NOTIFICATION_LONG_POLL_TIMEOUT
+const RETRY_DELAY = 5000; // After a failed poll or a dropped stream
+
+// One connection per tab, shared by every subscriber
+const listeners = new Set();
+let connection = null;
+
+const notifyListeners = () => listeners.forEach((listener) => listener());
+
+// Uses the server-sent event stream when the backend runs under ASGI and
+// falls back to the poll endpoint otherwise. Returns a function that closes
+// the connection.
+const connect = (token) => {
+  let source = null;
+  let polling = false;
+  let stopped = false;
+  let retryTimer = null;
+  const controller = new AbortController();
+
+  const poll = async (after) => {
+    if (stopped) return;
+    const params = new URLSearchParams({ timeout: LONG_POLL_TIMEOUT });
+    if (after !== null) params.set('after', after);
+    try {
+      const response = await fetch(`${API_BASE_URL}/api/notifications/poll/?${params}`, {
+        headers: { Authorization: `Bearer ${token}` },
+        signal: controller.signal,
+      });
+      if (!response.ok) throw new Error(`Long poll failed with ${response.status}`);
+      const data = await response.json();
+      if (data.results.length) notifyListeners();
+      // next_poll is 0 when the server held the request open (ASGI) and the
+      // plain polling interval when it answered straight away (WSGI)
+      retryTimer = setTimeout(() => poll(data.last_id), data.next_poll * 1000);
+    } catch (error) {
+      if (!stopped) retryTimer = setTimeout(() => poll(after), RETRY_DELAY);
+    }
+  };
+
+  const startPolling = () => {
+    if (!polling) {
+      polling = true;
+      poll(null);
+    }
+  };
+
+  // EventSource cannot send the Authorization header, so the stream is
+  // opened with a single-use ticket instead of the access token. A dropped
+  // stream needs a new ticket; last_id lets the server replay what was missed.
+  let lastId = null;
+  const openStream = async () => {
+    if (stopped) return;
+    try {
+      const response = await fetch(`${API_BASE_URL}/api/notifications/stream/ticket/`, {
+        method: 'POST',
+        headers: { Authorization: `Bearer ${token}` },
+        signal: controller.signal,
+      });
+      if (!response.ok) throw new Error(`Stream ticket failed with ${response.status}`);
+      const { ticket, streaming } = await response.json();
+      if (stopped) return;
+      if (!streaming) {
+        startPolling();
+        return;
+      }
+      const params = new URLSearchParams({ ticket });
+      if (lastId !== null) params.set('last_id', lastId);
+      source = new EventSource(`${API_BASE_URL}/api/notifications/stream/?${params}`);
+      source.addEventListener('notification', (event) => {
+        lastId = event.lastEventId;
+        notifyListeners();
+      });
+      source.onerror = () => {
+        // Its own retry would reuse the spent ticket
+        source.close();
+        source = null;
+        if (!stopped) retryTimer = setTimeout(openStream, RETRY_DELAY);
+      };
+    } catch (error) {
+      if (!stopped) retryTimer = setTimeout(openStream, RETRY_DELAY);
+    }
+  };
+
+  if (window.EventSource) {
+    openStream();
+  } else {
+    startPolling();
+  }
+
+  return () => {
+    stopped = true;
+    if (source) source.close();
+    if (retryTimer) clearTimeout(retryTimer);
+    controller.abort();
+  };
+};
+
+// Calls onChange whenever a new notification arrives. Every component in
+// the tab shares one connection, which closes with the last subscriber.
+// Returns a cleanup function.
+export const subscribeToNotifications = (token, onChange) => {
+  if (connection && connection.token !== token) {
+    // Logged in again: reconnect with the new token
+    connection.close();
+    connection = null;
+  }
+  if (!connection) {
+    connection = { token, close: connect(token) };
+  }
+  listeners.add(onChange);
+
+  return () => {
+    listeners.delete(onChange);
+    if (!listeners.size && connection) {
+      connection.close();
+      connection = null;
+    }
+  };
+};